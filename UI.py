@@ -1,37 +1,77 @@
-from typing import *
+import time
+from collections import OrderedDict, namedtuple
+from functools import partial
+from typing import List, Optional
 
-from PyQt5 import QtCore, QtWidgets
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
+import numpy as np
+from PyQt5 import QtCore, QtGui, QtWidgets
 
-from functions import BUILTIN_FUNCTIONS
+from chebyshev import MAX_N, ChebyshevInterpolant
+from functions import BUILTIN_FUNCTIONS, make_function
 
-from util import load_csv, sort_together
+from sampling import adaptive_sample
+from timing import counters
+from util import parse_pairs, stream_csv, sort_together
 
-from methods import lagrange_interpolate, newton_finite, newton_divided, stirling_interpolate, bessel_interpolate
+from methods import (FINITE_METHODS, DiffTable, NewtonInterpolant, UniformGrid, divided_differences, finite_cache,
+                     fingerprint, update_differences)
+
+from workers import (METHOD_TITLES, Job, MethodResult, Task, compute_method, compute_series, compute_table,
+                     compute_validation)
+
+
+CachedCurve = namedtuple("CachedCurve", "xx yy fitted")
 
 
 class NodeTableModel(QtCore.QAbstractTableModel):
     headers = ["x", "y"]
 
+    # узлы лежат в буферах float64 с запасом ёмкости: x — вектор, y — матрица
+    # (строки, ряды); xs/ys/series — срезы по числу строк. Массовые правки
+    # меняют буферы целиком и посылают один сигнал на операцию
     def __init__(self, xs=None, ys=None):
         super().__init__()
-        self.xs: List[float] = xs or []
-        self.ys: List[float] = ys or []
+        self._xbuf = np.asarray(xs if xs is not None else [], dtype=float)
+        self._ybuf = _as_series(ys if ys is not None else [], len(self._xbuf))
+        self._n = len(self._xbuf)
+        self._newton: Optional[NewtonInterpolant] = None
+        self._divided: Optional[DiffTable] = None  # полная таблица для живого режима
+
+    @property
+    def xs(self) -> np.ndarray:
+        return self._xbuf[:self._n]
+
+    @property
+    def ys(self) -> np.ndarray:
+        # первый ряд: по нему строятся таблица разностей и полином Ньютона
+        return self._ybuf[:self._n, 0]
+
+    @property
+    def series(self) -> np.ndarray:
+        return self._ybuf[:self._n]
 
     # --- Qt boilerplate ---
     def rowCount(self, _=QtCore.QModelIndex()):
-        return len(self.xs)
+        return self._n
 
     def columnCount(self, _=QtCore.QModelIndex()):
-        return 2
+        return 1 + self._ybuf.shape[1]
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role != QtCore.Qt.DisplayRole:
+            return None
+        if orientation == QtCore.Qt.Vertical:
+            return str(section + 1)
+        if section < len(self.headers) and self._ybuf.shape[1] == 1:
+            return self.headers[section]
+        return "x" if section == 0 else f"y{section}"
 
     def data(self, index, role=QtCore.Qt.DisplayRole):
         if not index.isValid():
             return None
         r, c = index.row(), index.column()
         if role in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole):
-            return str(self.xs[r] if c == 0 else self.ys[r])
+            return repr(float(self._xbuf[r] if c == 0 else self._ybuf[r, c - 1]))
         return None
 
     def setData(self, index, value, role):
@@ -42,7 +82,24 @@ class NodeTableModel(QtCore.QAbstractTableModel):
         except Exception:
             return False
         r, c = index.row(), index.column()
-        (self.xs if c == 0 else self.ys)[r] = val
+        # правка одного узла: таблицы конечных и разделённых разностей
+        # обновляются полосой, а не строятся заново (ряды y2… в них не входят)
+        if c == 1:
+            finite_cache.update_node(self.xs, self.ys, r, val)
+        elif c == 0:
+            finite_cache.invalidate(self.xs, self.ys)
+        if c == 0:
+            self._xbuf[r] = val
+        else:
+            self._ybuf[r, c - 1] = val
+        if c <= 1 and self._divided is not None:
+            try:
+                update_differences(self._divided, r, val if c == 1 else None, self.xs)
+                self._newton = NewtonInterpolant.from_table(self.xs, self._divided)
+            except ZeroDivisionError:
+                self._newton = self._divided = None
+        elif c <= 1:
+            self._newton = None
         self.dataChanged.emit(index, index)
         return True
 
@@ -50,30 +107,225 @@ class NodeTableModel(QtCore.QAbstractTableModel):
         return QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsEditable
 
     # helpers
+    def _reserve(self, n):
+        if n <= len(self._xbuf):
+            return
+        cap = max(16, 2 * len(self._xbuf), n)
+        for name in ("_xbuf", "_ybuf"):
+            old = getattr(self, name)
+            buf = np.empty((cap,) + old.shape[1:])
+            buf[:self._n] = old[:self._n]
+            setattr(self, name, buf)
+
     def insert_row(self, x=0.0, y=0.0):
-        self.beginInsertRows(QtCore.QModelIndex(), self.rowCount(), self.rowCount())
-        self.xs.append(x)
-        self.ys.append(y)
+        self.beginInsertRows(QtCore.QModelIndex(), self._n, self._n)
+        self._reserve(self._n + 1)
+        self._xbuf[self._n] = x
+        self._ybuf[self._n] = y
+        self._n += 1
+        self._divided = None
+        if self._newton is not None:
+            try:
+                self._newton.append(x, y)
+            except ZeroDivisionError:
+                self._newton = None
+        self.endInsertRows()
+
+    def insert_rows(self, row, xs, ys):
+        # одиночный ряд y при нескольких рядах в таблице копируется во все
+        xs = np.asarray(xs, dtype=float)
+        ys = _as_series(ys, len(xs))
+        if len(xs) != len(ys):
+            raise ValueError("Массивы должны быть одной длины")
+        if not len(xs):
+            return
+        n, k = self._n, len(xs)
+        self.beginInsertRows(QtCore.QModelIndex(), row, row + k - 1)
+        self._reserve(n + k)
+        for buf, new in ((self._xbuf, xs), (self._ybuf, ys)):
+            buf[row + k:n + k] = buf[row:n].copy()
+            buf[row:row + k] = new
+        self._n += k
+        self._newton = self._divided = None
         self.endInsertRows()
 
+    def remove_row(self, i):
+        self.remove_rows([i])
+
+    def remove_rows(self, rows):
+        rows = np.unique(np.asarray(rows, dtype=np.intp))
+        if not rows.size:
+            return
+        contiguous = rows[-1] - rows[0] + 1 == rows.size
+        if contiguous:
+            self.beginRemoveRows(QtCore.QModelIndex(), int(rows[0]), int(rows[-1]))
+        else:
+            self.beginResetModel()
+        keep = np.ones(self._n, dtype=bool)
+        keep[rows] = False
+        self._xbuf, self._ybuf = self.xs[keep], self.series[keep]
+        self._n = len(self._xbuf)
+        self._newton = self._divided = None
+        if contiguous:
+            self.endRemoveRows()
+        else:
+            self.endResetModel()
+
+    def paste(self, row, xs, ys):
+        # вставка из буфера обмена поверх строк начиная с row, лишнее — в конец
+        xs = np.asarray(xs, dtype=float)
+        ys = _as_series(ys, len(xs))
+        overlap = max(0, min(len(xs), self._n - row))
+        if overlap:
+            finite_cache.invalidate(self.xs, self.ys)
+            self._xbuf[row:row + overlap] = xs[:overlap]
+            self._ybuf[row:row + overlap] = ys[:overlap]
+            self._newton = self._divided = None
+            self.dataChanged.emit(self.index(row, 0), self.index(row + overlap - 1, self.columnCount() - 1))
+        self.insert_rows(self._n, xs[overlap:], ys[overlap:])
+
+    def replace(self, xs, ys):
+        # массивы принимаются как есть, без копирования; ys — вектор или матрица рядов
+        xs = np.asarray(xs, dtype=float)
+        ys = _as_series(ys, len(xs))
+        if len(xs) != len(ys):
+            raise ValueError("Массивы должны быть одной длины")
+        self.beginResetModel()
+        self._xbuf, self._ybuf, self._n = xs, ys, len(xs)
+        self._newton = self._divided = None
+        self.endResetModel()
+
+    def sort(self):
+        xs, ys = sort_together(self.xs, self.series)
+        if np.shares_memory(xs, self._xbuf):
+            return  # уже по возрастанию
+        # набор узлов тот же, поэтому полином Ньютона остаётся верным,
+        # а таблица разностей зависит от порядка и сбрасывается
+        self.beginResetModel()
+        self._xbuf, self._ybuf = xs, ys
+        self._divided = None
+        self.endResetModel()
+
+    def newton(self, build=True) -> Optional[NewtonInterpolant]:
+        # полином Ньютона по текущим узлам; порядок узлов на значения не влияет,
+        # поэтому сортировка в _collect_nodes его не сбрасывает
+        if self._newton is None or len(self._newton) != self._n:
+            self._newton = NewtonInterpolant(self.xs, self.ys) if build else None
+        return self._newton
+
+    def divided(self) -> DiffTable:
+        # полная таблица разделённых разностей: по ней правка узла обновляет
+        # полином Ньютона за O(n) на уровень (см. setData)
+        if self._divided is None or self._divided.n != self._n:
+            self._divided = divided_differences(self.xs, self.ys)
+            self._newton = NewtonInterpolant.from_table(self.xs, self._divided)
+        return self._divided
+
+    def adopt_newton(self, newton: NewtonInterpolant):
+        # полином, построенный в фоне по копии текущих узлов; берётся копия —
+        # оригинал лежит в кэше кривых, а append в insert_row меняет полином на месте
+        if len(newton) == self._n:
+            self._newton = newton.copy()
+
     def clear(self):
+        self.replace([], [])
+
+
+def _as_series(ys, n):
+    ys = np.asarray(ys, dtype=float)
+    return ys.reshape(n, 1) if ys.ndim < 2 and ys.size == n else ys
+
+
+def _stack_series(xx, yy):
+    # ряды матрицы yy в одну линию через разрывы NaN: один артист на метод
+    yy = np.asarray(yy, dtype=float)
+    if yy.ndim < 2:
+        return xx, yy
+    k = yy.shape[1]
+    gap = np.full((1, k), np.nan)
+    xs = np.vstack([np.repeat(np.asarray(xx, dtype=float)[:, None], k, axis=1), gap])
+    return xs.T.ravel(), np.vstack([yy, gap]).T.ravel()
+
+
+class DiffTableModel(QtCore.QAbstractTableModel):
+    # таблица конечных разностей только для чтения: строки форматируются
+    # в data() лишь для видимых ячеек, сама таблица не копируется
+    def __init__(self):
+        super().__init__()
+        self.xs = []
+        self.table = None
+
+    def set_table(self, xs, table):
         self.beginResetModel()
-        self.xs.clear()
-        self.ys.clear()
+        self.xs, self.table = xs, table
         self.endResetModel()
 
+    def rowCount(self, _=QtCore.QModelIndex()):
+        return len(self.xs)
+
+    def columnCount(self, _=QtCore.QModelIndex()):
+        return len(self.table) + 2 if self.table is not None else 0
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role != QtCore.Qt.DisplayRole or orientation != QtCore.Qt.Horizontal:
+            return None
+        if section < 3:
+            return ("i", "xi", "yi")[section]
+        return f"Δ^{section - 2}y"
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid() or role != QtCore.Qt.DisplayRole:
+            return None
+        i, c = index.row(), index.column()
+        if c == 0:
+            return str(i)
+        if c == 1:
+            return f"{self.xs[i]:.5g}"
+        k = c - 2  # Δ^0 — сами yi
+        if i >= len(self.xs) - k:  # на k-м уровне на k клеток меньше
+            return None
+        return f"{self.table[k][i]:.5g}"
+
 
 ###############################################################################
 # Главное окно                                                                #
 ###############################################################################
 
 class InterpolationWindow(QtWidgets.QMainWindow):
+    UNIFORM_MAX_N = 99  # на равномерной сетке больше узлов смысла не имеет
+    LIVE_DELAY_MS = 120
+    LIVE_SETTLE_MS = 600
+    LIVE_FRAME_BUDGET = 1 / 30  # с, от правки до обновлённых кривых
+    LIVE_MIN_PX, LIVE_MAX_PX = 64, 4096
+    LIVE_TABLE_MAX = 2048  # больше узлов — полная таблица разностей не держится
+    CANVAS_IDLE_MS = 50  # холст строится после первой отрисовки окна, если расчёт не начался раньше
+
+    canvas_ready = QtCore.pyqtSignal()
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("ЛР № 5 – Интерполяция функции")
         self.resize(1024, 640)
         self.model = NodeTableModel()
+        self._pool = QtCore.QThreadPool(self)
+        self._job: Optional[Job] = None
+        self._job_seq = 0
+        self._job_data = {}
+        self._cheb: Optional[ChebyshevInterpolant] = None  # узлы Чебышёва последнего расчёта
         self._build_ui()
+        # любая правка узлов делает текущий расчёт устаревшим
+        for sig in (self.model.dataChanged, self.model.rowsInserted, self.model.rowsRemoved, self.model.modelReset):
+            sig.connect(self._cancel_job)
+
+        # живой режим: правки копятся LIVE_DELAY_MS, затем пересчёт с кривыми
+        # по бюджету кадра; когда правки стихнут — пересчёт в полном разрешении
+        self._live_px = self.LIVE_MAX_PX
+        self._live_timer = QtCore.QTimer(self, singleShot=True, interval=self.LIVE_DELAY_MS)
+        self._live_timer.timeout.connect(self._live_compute)
+        self._settle_timer = QtCore.QTimer(self, singleShot=True, interval=self.LIVE_SETTLE_MS)
+        self._settle_timer.timeout.connect(self._compute)
+        for sig in (self.model.dataChanged, self.model.rowsInserted, self.model.rowsRemoved):
+            sig.connect(self._schedule_live)
 
     # ------------------------- UI ---------------------------------------
     def _build_ui(self):
@@ -102,6 +354,11 @@ class InterpolationWindow(QtWidgets.QMainWindow):
         tv.horizontalHeader().setStretchLastSection(True)
         v_data.addWidget(tv, 1)
         self.table_view = tv
+        act_paste = QtWidgets.QAction(tv)
+        act_paste.setShortcut(QtGui.QKeySequence.Paste)
+        act_paste.setShortcutContext(QtCore.Qt.WidgetShortcut)
+        act_paste.triggered.connect(self._paste_rows)
+        tv.addAction(act_paste)
 
         btns = QtWidgets.QHBoxLayout()
         v_data.addLayout(btns)
@@ -121,14 +378,29 @@ class InterpolationWindow(QtWidgets.QMainWindow):
         v_data.addLayout(h_func)
         self.func_combo = QtWidgets.QComboBox()
         self.func_combo.addItems(BUILTIN_FUNCTIONS.keys())
+        # можно ввести своё выражение от x, например x**2*sin(3*x)
+        self.func_combo.setEditable(True)
+        self.func_combo.setInsertPolicy(QtWidgets.QComboBox.NoInsert)
         self.func_a, self.func_b = QtWidgets.QLineEdit("0"), QtWidgets.QLineEdit("3.1416")
         self.func_n = QtWidgets.QSpinBox()
-        self.func_n.setRange(2, 99)
+        self.func_n.setRange(2, self.UNIFORM_MAX_N)
         self.func_n.setValue(7)
         for w in (QtWidgets.QLabel("f(x):"), self.func_combo, QtWidgets.QLabel("a:"), self.func_a,
                   QtWidgets.QLabel("b:"), self.func_b, QtWidgets.QLabel("n:"), self.func_n):
             h_func.addWidget(w)
 
+        # узлы Чебышёва: n до MAX_N, при заданной точности n подбирается сам
+        h_cheb = QtWidgets.QHBoxLayout()
+        v_data.addLayout(h_cheb)
+        self.func_nodes = QtWidgets.QComboBox()
+        self.func_nodes.addItems(["равномерные", "Чебышёва"])
+        self.func_nodes.currentIndexChanged.connect(
+            lambda i: self.func_n.setRange(2, MAX_N if i == 1 else self.UNIFORM_MAX_N))
+        self.func_tol = QtWidgets.QLineEdit()
+        self.func_tol.setPlaceholderText("по n")
+        for w in (QtWidgets.QLabel("узлы:"), self.func_nodes, QtWidgets.QLabel("точность:"), self.func_tol):
+            h_cheb.addWidget(w)
+
         # ---- TAB «Параметры» ---------------------------------------------
         tab_par = QtWidgets.QWidget()
         tabs.addTab(tab_par, "Параметры")
@@ -149,71 +421,128 @@ class InterpolationWindow(QtWidgets.QMainWindow):
         self.inp_x0 = QtWidgets.QLineEdit("0.5")
         h_x0.addWidget(self.inp_x0)
 
+        # окно локальной интерполяции: 0 — глобальный полином по всем узлам
+        h_stencil = QtWidgets.QHBoxLayout()
+        v_par.addLayout(h_stencil)
+        h_stencil.addWidget(QtWidgets.QLabel("Узлов в шаблоне:"))
+        self.stencil_n = QtWidgets.QSpinBox()
+        self.stencil_n.setRange(0, 9999)
+        self.stencil_n.setSpecialValueText("все")
+        h_stencil.addWidget(self.stencil_n)
+
         self.btn_compute = QtWidgets.QPushButton("Вычислить")
         v_par.addWidget(self.btn_compute)
-        self.btn_compute.clicked.connect(self._compute)
+        self.btn_compute.clicked.connect(lambda: self._compute())
+
+        self.btn_validate = QtWidgets.QPushButton("Проверка без одного узла")
+        v_par.addWidget(self.btn_validate)
+        self.btn_validate.clicked.connect(self._validate)
+
+        self.chk_live = QtWidgets.QCheckBox("Пересчитывать при правке узлов")
+        v_par.addWidget(self.chk_live)
+
+        self.chk_timing = QtWidgets.QCheckBox("Счётчики времени")
+        v_par.addWidget(self.chk_timing)
+        self.chk_timing.toggled.connect(self._toggle_timing)
+
+        self.progress = QtWidgets.QProgressBar()
+        self.progress.setFormat("%v / %m")
+        self.progress.hide()
+        v_par.addWidget(self.progress)
 
         self.results_edit = QtWidgets.QPlainTextEdit()
         self.results_edit.setReadOnly(True)
         v_par.addWidget(self.results_edit, 2)
 
+        # счётчики горячих путей за последний расчёт (только при chk_timing)
+        self.timing_edit = QtWidgets.QPlainTextEdit()
+        self.timing_edit.setReadOnly(True)
+        self.timing_edit.hide()
+        v_par.addWidget(self.timing_edit, 1)
+
         # новая таблица Δ              (пока пустая, скрыта)
-        self.finite_table = QtWidgets.QTableWidget()
+        self.diff_model = DiffTableModel()
+        self.finite_table = QtWidgets.QTableView()
+        self.finite_table.setModel(self.diff_model)
         self.finite_table.hide()
         self.finite_table.horizontalHeader().setStretchLastSection(True)
         self.finite_table.verticalHeader().setVisible(False)
         v_par.addWidget(self.finite_table, 3)
 
         # ---- График -------------------------------------------------------
+        # matplotlib импортируется и холст строится отложенно (_ensure_canvas):
+        # до этого на его месте пустая заглушка
+        self._plot_box = hbox
+        self._plot_stub = QtWidgets.QLabel("Загрузка графика…", alignment=QtCore.Qt.AlignCenter)
+        hbox.addWidget(self._plot_stub, 1)
+        self.canvas = None
+        self._curve_lines = {}
+        self._curve_cache = OrderedDict()
+        self._legend_labels = ()
+        self._background = None
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.canvas is None:
+            QtCore.QTimer.singleShot(self.CANVAS_IDLE_MS, self._ensure_canvas)
+
+    def _ensure_canvas(self):
+        if self.canvas is not None:
+            return
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+        from matplotlib.figure import Figure
+
         self.figure = Figure(figsize=(5, 4))
         self.canvas = FigureCanvas(self.figure)
-        hbox.addWidget(self.canvas, 1)
+        self._plot_box.replaceWidget(self._plot_stub, self.canvas)
+        self._plot_stub.deleteLater()
+        self._ax = ax = self.figure.add_subplot(111)
+        ax.set_title("Интерполяция функции")
+        ax.grid(True, linestyle=":", linewidth=0.5)
+        self._nodes_line, = ax.plot([], [], "o", color="black", label="узлы")
+        self._f_line, = ax.plot([], [], color="C0", label="f(x)")
+        self._point_line, = ax.plot([], [], "o", color="red", label="_точка", animated=True)
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+        self.canvas_ready.emit()
 
     # ------------------------- helpers -----------------------------------
     def _delete_selected_row(self):
-        sel = self.table_view.selectionModel().selectedRows()
-        for i in sorted([s.row() for s in sel], reverse=True):
-            self.model.beginRemoveRows(QtCore.QModelIndex(), i, i)
-            del self.model.xs[i]
-            del self.model.ys[i]
-            self.model.endRemoveRows()
+        # строки берутся диапазонами выделения, без индекса на каждую ячейку
+        ranges = self.table_view.selectionModel().selection()
+        rows = [np.arange(r.top(), r.bottom() + 1) for r in ranges]
+        if rows:
+            self.model.remove_rows(np.concatenate(rows))
+
+    def _paste_rows(self):
+        xs, ys, _ = parse_pairs(QtWidgets.QApplication.clipboard().text())
+        if not len(xs):
+            return
+        current = self.table_view.currentIndex()
+        row = current.row() if current.isValid() else self.model.rowCount()
+        self.model.paste(row, xs, ys)
 
     def _load_csv_dialog(self):
         path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "CSV …", "", "All files (*)")
         if not path:
             return
         try:
-            xs, ys = load_csv(path)
+            data = stream_csv(path, series=True)
         except Exception as exc:
             QtWidgets.QMessageBox.critical(self, "Ошибка чтения CSV", str(exc))
             return
-        self.model.beginResetModel()
-        self.model.xs, self.model.ys = xs, ys
-        self.model.endResetModel()
-
-    def _show_finite_table(self, xs: List[float], ys: List[float], table: List[List[float]]):
-        n = len(xs)
-        levels = len(table) - 1  # Δ^0 … Δ^levels
-        headers = ["i", "xi", "yi"] + [f"Δ^{k}y" for k in range(1, levels + 1)]
-        self.finite_table.setColumnCount(len(headers));
-        self.finite_table.setRowCount(n)
-        self.finite_table.setHorizontalHeaderLabels(headers)
-        for i in range(n):
-            self.finite_table.setItem(i, 0, QtWidgets.QTableWidgetItem(str(i)))
-            self.finite_table.setItem(i, 1, QtWidgets.QTableWidgetItem(f"{xs[i]:.5g}"))
-            self.finite_table.setItem(i, 2, QtWidgets.QTableWidgetItem(f"{ys[i]:.5g}"))
-        # остальные разности
-        for k in range(1, levels + 1):
-            col = 2 + k  # смещение от начала
-            for i in range(n - k):  # на k‑м уровне на одну клетку меньше
-                val = table[k][i]
-                self.finite_table.setItem(i, col, QtWidgets.QTableWidgetItem(f"{val:.5g}"))
-        # оформление
-        self.finite_table.resizeColumnsToContents()
+        self.model.replace(data.xs, data.ys)
+        self.statusBar().showMessage(f"Загружено строк: {len(data.xs)}, пропущено: {data.skipped}")
+
+    def _show_finite_table(self, xs: List[float], ys: List[float], table):
+        self.diff_model.set_table(xs, table)
+        # подгонка ширины обходит все ячейки — только для небольших таблиц
+        if self.diff_model.columnCount() <= 50:
+            self.finite_table.resizeColumnsToContents()
         self.finite_table.show()
 
     # -------------------------- core --------------------------------------
     def _collect_nodes(self):
+        self._cheb = None
         if self.radio_func.isChecked():
             try:
                 a = float(self.func_a.text().replace(",", "."))
@@ -223,109 +552,351 @@ class InterpolationWindow(QtWidgets.QMainWindow):
             if a >= b:
                 raise ValueError("Требуется a < b")
             n = self.func_n.value()
-            f = BUILTIN_FUNCTIONS[self.func_combo.currentText()]
-            xs = [a + i * (b - a) / (n - 1) for i in range(n)]
-            ys = [f(x) for x in xs]
-            self.model.beginResetModel()
-            self.model.xs, self.model.ys = xs, ys
-            self.model.endResetModel()
+            f = make_function(self.func_combo.currentText())
+            if self.func_nodes.currentIndex() == 1:
+                tol = self.func_tol.text().strip().replace(",", ".")
+                try:
+                    tol = float(tol) if tol else None
+                except ValueError:
+                    raise ValueError("Некорректная точность")
+                cheb = ChebyshevInterpolant.from_function(f, a, b, None if tol else n, tol or 1e-13)
+                if tol:
+                    self.func_n.setValue(len(cheb.xs))
+                self._cheb = cheb
+                self.model.replace(cheb.xs, cheb.ys)
+                return cheb.xs, cheb.ys
+            grid = UniformGrid.from_bounds(a, b, n)
+            ys = f(np.asarray(grid))
+            if not np.all(np.isfinite(ys)):
+                raise ValueError("Функция не определена в части узлов")
+            self.model.replace(np.asarray(grid), ys)
+            return grid, ys
         else:
-            xs, ys = sort_together(self.model.xs, self.model.ys)
-            self.model.beginResetModel()
-            self.model.xs, self.model.ys = xs, ys
-            self.model.endResetModel()
-        return self.model.xs, self.model.ys
-
-    def _compute(self):
+            self.model.sort()
+        series = self.model.series
+        return self.model.xs, series if series.shape[1] > 1 else self.model.ys
+
+    def _method_boxes(self):
+        return [("lagrange", self.chk_lagr), ("divided", self.chk_div), ("finite", self.chk_fin),
+                ("stirling", self.chk_stirling), ("bessel", self.chk_bessel)]
+
+    def _cancel_job(self):
+        if self._job is not None:
+            self._job.cancel()
+            self._job = None
+        self.progress.hide()
+
+    def _compute(self, live=False):
+        # live — пересчёт после правки в живом режиме: ошибки в строку состояния,
+        # а не в диалог, и кривые с числом точек по бюджету кадра
+        self._ensure_canvas()
+        self._cancel_job()
+        self._settle_timer.stop()
         try:
             xs, ys = self._collect_nodes()
         except Exception as e:
-            QtWidgets.QMessageBox.critical(self, "Ошибка", str(e))
+            self._report(QtWidgets.QMessageBox.critical, str(e), live)
             return
         if len(xs) < 2:
-            QtWidgets.QMessageBox.warning(self, "Ошибка", "Нужно минимум 2 узла интерполяции");
+            self._report(QtWidgets.QMessageBox.warning, "Нужно минимум 2 узла интерполяции", live)
             return
         try:
             x0 = float(self.inp_x0.text().replace(",", "."))
         except ValueError:
-            QtWidgets.QMessageBox.warning(self, "Ошибка", "Некорректное значение x₀")
+            self._report(QtWidgets.QMessageBox.warning, "Некорректное значение x₀", live)
             return
 
-        results, curves = [], []
-        res_value = None
+        # рабочие потоки получают копии узлов: правка таблицы не затронет расчёт
+        if not isinstance(xs, UniformGrid):
+            xs = np.array(xs, dtype=float)
+        ys = np.array(ys, dtype=float)
+        multi = ys.ndim > 1  # несколько рядов: кривые всех рядов на общей сетке
+        width = self.stencil_n.value() or None
+        methods = [m for m, chk in self._method_boxes() if chk.isChecked()]
+        cheb = self._cheb
+        skipped = {}
+        if cheb is not None:
+            # на узлах Чебышёва всегда считается ДКП-интерполянт, прямые схемы —
+            # только пока узлов не больше, чем допускает равномерная сетка
+            if len(xs) > self.UNIFORM_MAX_N:
+                skipped = {m: MethodResult(m, f"⚠ {METHOD_TITLES[m]}: n = {len(xs)}, считается только по Чебышёву",
+                                           None, None, None, None, None) for m in methods}
+            methods = ["chebyshev"] + methods
+        run = [m for m in methods if m not in skipped]
+        # при локальном шаблоне показываются только width уровней; полная таблица — O(n²)
+        # памяти, поэтому без шаблона она строится лишь до LIVE_TABLE_MAX узлов
+        table_depth = width if width is not None and width < len(xs) else None
+        need_table = any(m in FINITE_METHODS for m in run) and (table_depth is not None
+                                                               or len(xs) <= self.LIVE_TABLE_MAX)
+
+        self._job_seq += 1
+        job = Job(self._job_seq, len(run) + need_table)
+        self._job = job
+        self._job_data = {"xs": xs, "ys": ys, "x0": x0, "methods": methods, "results": skipped, "live": live,
+                          "started": time.perf_counter()}
         self.finite_table.hide()
+        self.results_edit.setPlainText("Вычисление…")
+        self._reset_counters()
+        self.progress.setRange(0, job.pending)
+        self.progress.setValue(0)
+        self.progress.setVisible(job.pending > 0)
+
+        # ---------- график: артисты живут между расчётами ------------------
+        self._nodes_line.set_data(*_stack_series(np.asarray(xs), ys))
+        self._point_line.set_data([], [])
+        lo, hi = min(xs), max(xs)
+        sample = self._sampler(lo, hi, self._live_px if live else None)
+        if self.radio_func.isChecked():
+            name = self.func_combo.currentText()
+            key = ("f(x)", name, lo, hi, sample.keywords["width_px"])
+            curve = self._curve_cache.get(key)
+            if curve is None:
+                curve = self._remember_curve(key, *sample(make_function(name)))
+            self._f_line.set_data(curve.xx, curve.yy)
+        self._f_line.set_visible(self.radio_func.isChecked())
+
+        nodes_fp = fingerprint(xs, ys)
+        for m, line in self._curve_lines.items():
+            line.set_visible(m in run)
+        newton = self.model.newton(build=False)
+        for m in run:
+            line = self._curve_line(m)
+            curve = self._curve_cache.get((m, nodes_fp, width, sample.keywords["width_px"]))
+            if curve is not None:
+                # узлы и метод не менялись: кривая уже посчитана, нужен только y(x₀)
+                line.set_data(*_stack_series(curve.xx, curve.yy))
+                fitted = curve.fitted
+            else:
+                line.set_data([], [])
+                fitted = newton.copy() if m == "divided" and newton is not None else None
+                if m == "chebyshev":
+                    fitted = cheb
+            if multi:
+                # адаптивная выборка у каждого ряда своя — берём общую сетку по ширине графика
+                xx = None if curve is not None else np.linspace(lo, hi, sample.keywords["width_px"])
+                self._submit(Task(job, m, compute_series, m, xs, ys, x0, xx, width))
+            else:
+                self._submit(Task(job, m, compute_method, m, xs, ys, x0, None if curve is not None else sample,
+                                  width, fitted=fitted))
+        self._job_data["key"] = (nodes_fp, width, sample.keywords["width_px"])
+        if need_table:
+            self._submit(Task(job, "table", compute_table, xs, ys[:, 0] if multi else ys, table_depth))
+        self._rescale()
+        if not job.pending:
+            self._finish_job(job)
+
+    def _validate(self):
+        # остатки «без одного узла» и разброс методов — в панель результатов
+        self._ensure_canvas()
+        self._cancel_job()
+        self._settle_timer.stop()
+        try:
+            xs, ys = self._collect_nodes()
+        except Exception as e:
+            self._report(QtWidgets.QMessageBox.critical, str(e))
+            return
+        if len(xs) < 3:
+            self._report(QtWidgets.QMessageBox.warning, "Для перекрёстной проверки нужно минимум 3 узла")
+            return
+        if not isinstance(xs, UniformGrid):
+            xs = np.array(xs, dtype=float)
+        ys = np.array(ys, dtype=float)
+        if ys.ndim > 1:
+            ys = ys[:, 0]  # проверяется первый ряд
+        methods = [m for m, chk in self._method_boxes() if chk.isChecked()] or [m for m, _ in self._method_boxes()]
+        self._job_seq += 1
+        job = Job(self._job_seq, 1)
+        self._job = job
+        self._job_data = {"xs": xs, "ys": ys, "x0": None, "methods": ["validate"], "results": {}, "live": False,
+                          "started": time.perf_counter(), "key": None}
+        self.results_edit.setPlainText("Проверка…")
+        self._reset_counters()
+        self.progress.setRange(0, 1)
+        self.progress.setValue(0)
+        self.progress.show()
+        self._submit(Task(job, "validate", compute_validation, xs, ys, methods, self.stencil_n.value() or None))
+
+    def _toggle_timing(self, flag):
+        counters.enable(flag)
+        self._reset_counters()
+        self.timing_edit.setVisible(flag)
+
+    def _reset_counters(self):
+        counters.reset()
+        self._cache_base = finite_cache.stats()
+        self.timing_edit.clear()
+
+    def _show_counters(self):
+        if not counters.enabled:
+            return
+        rows = sorted(counters.snapshot().items(), key=lambda item: -item[1]["seconds"])
+        lines = [f"{'счётчик':<16}{'вызовов':>9}{'всего, мс':>12}{'среднее, мс':>13}"]
+        for name, entry in rows:
+            total = entry["seconds"] * 1e3
+            lines.append(f"{name:<16}{entry['calls']:>9}{total:>12.3f}{total / entry['calls']:>13.4f}")
+        cache = finite_cache.stats()
+        lines.append(f"кэш таблиц: попаданий {cache['hits'] - self._cache_base['hits']}, "
+                     f"промахов {cache['misses'] - self._cache_base['misses']}")
+        self.timing_edit.setPlainText("\n".join(lines))
+
+    def _report(self, box, message, live=False):
+        if live:
+            self.statusBar().showMessage(message, 5000)
+        else:
+            box(self, "Ошибка", message)
 
-        # Лагранж -----------------------------------------------------------
-        if self.chk_lagr.isChecked():
-            y_l = lagrange_interpolate(x0, xs, ys)
-            res_value = y_l
-            results.append(f"Лагранж: y({x0}) ≈ {y_l:.10g}")
-            curves.append(("Лагранж", lambda t, xs=xs, ys=ys: lagrange_interpolate(t, xs, ys)))
-
-        # Ньютон / разделённые ---------------------------------------------
-        if self.chk_div.isChecked():
-            y_d, tbl_d = newton_divided(x0, xs, ys)
-            res_value = y_d
-            results.append(f"Ньютон (разделённые): y({x0}) ≈ {y_d:.10g}")
-            curves.append(("Ньютон (разделённые)", lambda t, xs=xs, ys=ys: newton_divided(t, xs, ys)[0]))
-
-        # Ньютон / конечные -----------------------------------------------
-        if self.chk_fin.isChecked():
-            try:
-                y_f, table_fin, form = newton_finite(x0, xs, ys)
-                res_value = y_f
-                results.append(f"Ньютон (конечные, {form}): y({x0}) ≈ {y_f:.10g}")
-                curves.append((f"Ньютон конечные ({form})", lambda t, xs=xs, ys=ys, f=form: (
-                    newton_finite(t, xs, ys)[0])))
-                self._show_finite_table(xs, ys, table_fin)
-            except ValueError:
-                results.append("⚠ Ньютон (конечные): узлы неравномерны, пропуск…")
-
-        if self.chk_stirling.isChecked():
-            try:
-                y_s, table_fin = stirling_interpolate(x0, xs, ys)
-                if not res_value:
-                    res_value = y_s
-                results.append(f"Стирлинг: y({x0}) ≈ {y_s:.10g}")
-                curves.append((f"Стирлинг", lambda t, xs=xs, ys=ys: stirling_interpolate(t, xs, ys)[0]))
-                self._show_finite_table(xs, ys, table_fin)
-            except ValueError:
-                results.append("⚠ Стирлинг: узлы неравномерны, пропуск…")
+    def _schedule_live(self, *_):
+        if self.chk_live.isChecked() and self.radio_manual.isChecked():
+            self._settle_timer.stop()
+            self._live_timer.start()  # перезапуск: серия правок даёт один пересчёт
 
-        if self.chk_bessel.isChecked():
+    def _live_compute(self):
+        if self.model.rowCount() <= self.LIVE_TABLE_MAX:
+            # следующая правка обновит таблицу и полином Ньютона полосой
             try:
-                y_s, table_fin = bessel_interpolate(x0, xs, ys)
-                if not res_value:
-                    res_value = y_s
-                results.append(f"Бессель: y({x0}) ≈ {y_s:.10g}")
-                curves.append((f"Бессель", lambda t, xs=xs, ys=ys: bessel_interpolate(t, xs, ys)[0]))
-                self._show_finite_table(xs, ys, table_fin)
-            except ValueError:
-                results.append("⚠ Бессель: узлы неравномерны, пропуск…")
-
-        self.results_edit.setPlainText("\n".join(results))
-
-        # ---------- график -------------------------------------------------
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-        ax.set_title("Интерполяция функции")
-        ax.grid(True, linestyle=":", linewidth=0.5)
-        ax.scatter(xs, ys, color="black", label="узлы")
-        if self.radio_func.isChecked():
-            f = BUILTIN_FUNCTIONS[self.func_combo.currentText()]
-            xx = self._linspace(min(xs), max(xs), 200)
-            ax.plot(xx, [f(t) for t in xx], label="f(x)")
-        colors = ["orange", "green", "blue", "pink", "purple"]
-        for i, (lbl, fn) in enumerate(curves):
-            xx = self._linspace(min(xs), max(xs), 400)
-            ax.plot(xx, [fn(t) for t in xx], label=lbl, linewidth=1.1, color=colors[i % len(colors)])
-        ax.legend(loc="best")
-        ax.scatter([x0], [res_value], color="red", label="точка")
-        self.canvas.draw()
-
-    @staticmethod
-    def _linspace(a: float, b: float, n: int):
-        if n < 2:
-            return [a]
-        step = (b - a) / (n - 1)
-        return [a + i * step for i in range(n)]
+                self.model.divided()
+            except ZeroDivisionError:
+                pass  # повтор узла — расчёт ниже сообщит об ошибке
+        self._compute(live=True)
+
+    def _submit(self, task):
+        task.signals.finished.connect(self._on_task_finished)
+        task.signals.failed.connect(self._on_task_failed)
+        self._pool.start(task)
+
+    def _on_task_finished(self, job, method, result):
+        if job is not self._job:
+            return  # устаревший расчёт
+        data = self._job_data
+        if method == "table":
+            if result is not None:
+                self._show_finite_table(data["xs"], data["ys"], result)
+        elif method == "validate":
+            data["results"][method] = result
+            self._show_results()
+        else:
+            data["results"][method] = result
+            if isinstance(result.fitted, NewtonInterpolant):
+                self.model.adopt_newton(result.fitted)
+            line = self._curve_line(method)
+            line.set_label(result.label or METHOD_TITLES[method])
+            if result.yy is not None:
+                self._remember_curve((method,) + data["key"], result.xx, result.yy, result.fitted)
+                line.set_data(*_stack_series(result.xx, result.yy))
+                self._refresh(result.yy)
+            self._show_results()
+        self._task_done(job)
+
+    def _on_task_failed(self, job, method, message):
+        if job is not self._job:
+            return
+        if method != "table":
+            self._job_data["results"][method] = MethodResult(
+                method, f"⚠ {METHOD_TITLES.get(method, 'Проверка')}: {message}", None, None, None, None, None)
+            self._show_results()
+        self._task_done(job)
+
+    def _show_results(self):
+        data = self._job_data
+        self.results_edit.setPlainText("\n".join(
+            data["results"][m].text for m in data["methods"] if m in data["results"]))
+
+    def _task_done(self, job):
+        job.pending -= 1
+        self.progress.setValue(self.progress.maximum() - job.pending)
+        if job.pending == 0:
+            self._finish_job(job)
+
+    def _finish_job(self, job):
+        data = self._job_data
+        self._job = None
+        self.progress.hide()
+        if data.get("live"):
+            # подстройка числа точек кривых под бюджет кадра
+            elapsed = time.perf_counter() - data["started"]
+            if elapsed > self.LIVE_FRAME_BUDGET:
+                self._live_px = max(self.LIVE_MIN_PX, int(self._live_px * self.LIVE_FRAME_BUDGET / elapsed))
+            elif elapsed < self.LIVE_FRAME_BUDGET / 2:
+                self._live_px = min(self.LIVE_MAX_PX, 2 * self._live_px)
+            if data["key"][-1] < self._sampler(0.0, 1.0).keywords["width_px"]:
+                self._settle_timer.start()
+        self._show_results()
+        self._show_counters()
+        res_value = None
+        for m in ("chebyshev", "finite", "divided", "lagrange", "stirling", "bessel"):
+            if m in data["results"] and data["results"][m].value is not None:
+                res_value = data["results"][m].value
+                break
+        if res_value is not None:
+            res_value = np.atleast_1d(res_value)
+            self._point_line.set_data(np.full(res_value.shape, data["x0"]), res_value)
+        handles = [self._nodes_line] + [ln for ln in [self._f_line] + list(self._curve_lines.values())
+                                        if ln.get_visible() and len(ln.get_xdata())]
+        labels = tuple(ln.get_label() for ln in handles)
+        if labels != self._legend_labels:
+            # состав легенды изменился — нужна полная перерисовка
+            self._legend_labels = labels
+            self._ax.legend(handles=handles, loc="best")
+            self._rescale()
+        else:
+            self._refresh(res_value if res_value is not None else [])
+
+    # ------------------------- график --------------------------------------
+    # Кривые методов и точка x₀ помечены animated: полная перерисовка рисует
+    # только оси, узлы и f(x) и запоминает этот фон, а приход новой кривой
+    # обходится восстановлением фона и blit. Полная перерисовка нужна, лишь
+    # когда меняются пределы осей или легенда.
+    CURVE_COLORS = {"lagrange": "orange", "divided": "green", "finite": "blue", "stirling": "pink",
+                    "bessel": "purple", "chebyshev": "brown"}
+
+    def _curve_line(self, method):
+        line = self._curve_lines.get(method)
+        if line is None:
+            line, = self._ax.plot([], [], linewidth=1.1, color=self.CURVE_COLORS[method], animated=True,
+                                  label=METHOD_TITLES[method])
+            self._curve_lines[method] = line
+        line.set_visible(True)
+        return line
+
+    def _remember_curve(self, key, xx, yy, fitted=None):
+        curve = CachedCurve(xx, yy, fitted)
+        self._curve_cache[key] = curve
+        self._curve_cache.move_to_end(key)
+        while len(self._curve_cache) > 64:
+            self._curve_cache.popitem(last=False)
+        return curve
+
+    def _sampler(self, lo, hi, max_px=None):
+        # число точек кривой ограничено шириной области графика в пикселях
+        bbox = self._ax.bbox
+        width_px = int(bbox.width) if bbox.width > 1 else self.canvas.width()
+        height_px = bbox.height if bbox.height > 1 else self.canvas.height()
+        if max_px is not None:
+            width_px = min(width_px, max_px)
+        return partial(adaptive_sample, a=lo, b=hi, width_px=max(width_px, 2), height_px=max(height_px, 1))
+
+    def _rescale(self):
+        self._ax.relim(visible_only=True)
+        self._ax.autoscale_view()
+        self.canvas.draw_idle()
+
+    def _refresh(self, yy):
+        # новые данные внутри текущих пределов — хватит blit, иначе полная перерисовка
+        lo, hi = self._ax.get_ylim()
+        yy = np.asarray(yy, dtype=float)
+        yy = yy[np.isfinite(yy)]
+        if self._background is None or (yy.size and (yy.min() < lo or yy.max() > hi)):
+            self._rescale()
+            return
+        self.canvas.restore_region(self._background)
+        self._draw_animated()
+        self.canvas.blit(self.figure.bbox)
+
+    def _draw_animated(self):
+        for line in list(self._curve_lines.values()) + [self._point_line]:
+            if line.get_visible():
+                self._ax.draw_artist(line)
+
+    def _on_draw(self, _event):
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_animated()
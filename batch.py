@@ -0,0 +1,161 @@
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from methods import (METHODS, LagrangeInterpolant, LocalInterpolant, NewtonInterpolant, _stencil, evaluate_many,
+                     evaluate_series)
+from util import CHUNK_ROWS, stream_column, stream_csv, sort_together
+
+# Пакетный режим без Qt и matplotlib: узлы читаются один раз и кладутся в общую
+# память, процессы пула строят интерполянт один раз и считают пачки запросов,
+# результат дописывается в выходной файл по мере готовности, в исходном порядке.
+
+_evaluate = None  # интерполянт рабочего процесса (см. _init_worker)
+_shm = None
+
+
+def make_evaluator(method, xs, ys, width=None):
+    # функция queries -> values; тяжёлое построение делается здесь один раз.
+    # Матрица ys (n, k) — k рядов: веса узлов общие, значения — матрица (m, k)
+    if np.ndim(ys) > 1:
+        return partial(evaluate_series, method, xs, ys, width=width)
+    if _stencil(len(xs), width) < len(xs):
+        return LocalInterpolant(xs, ys, method, width).many
+    if method == "lagrange":
+        return LagrangeInterpolant(xs, ys).many
+    if method == "divided":
+        return NewtonInterpolant(xs, ys).many
+    # конечным схемам таблицу держит finite_cache
+    return partial(evaluate_many, method, xs, ys)
+
+
+def _share(xs, ys):
+    # строка 0 — xs, остальные — ряды ys
+    rows = np.vstack([xs, np.asarray(ys, dtype=float).reshape(len(xs), -1).T])
+    shm = shared_memory.SharedMemory(create=True, size=max(1, rows.nbytes))
+    np.ndarray(rows.shape, dtype=float, buffer=shm.buf)[:] = rows
+    return shm, rows.shape
+
+
+def _init_worker(name, shape, series, method, width):
+    global _evaluate, _shm
+    # ссылка держится до конца процесса: массивы узлов смотрят в этот буфер
+    _shm = shared_memory.SharedMemory(name=name)
+    nodes = np.ndarray(shape, dtype=float, buffer=_shm.buf)
+    _evaluate = make_evaluator(method, nodes[0], nodes[1:].T if series else nodes[1], width)
+
+
+def _run_chunk(queries):
+    return _evaluate(queries)
+
+
+def _write_rows(out, queries, values):
+    np.savetxt(out, np.column_stack([queries, values]), fmt="%.17g", delimiter=",")
+
+
+def _run_pool(out, chunks, stats, xs, ys, series, method, width, workers):
+    shm, shape = _share(xs, ys)
+    try:
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(shm.name, shape, series, method, width)) as pool:
+            # в полёте не больше 2·workers пачек: память ограничена
+            # независимо от длины файла запросов
+            pending = deque()
+            for queries in chunks:
+                pending.append((queries, pool.submit(_run_chunk, queries)))
+                if len(pending) >= 2 * workers:
+                    done, future = pending.popleft()
+                    _write_rows(out, done, future.result())
+                    stats["queries"] += done.size
+            while pending:
+                done, future = pending.popleft()
+                _write_rows(out, done, future.result())
+                stats["queries"] += done.size
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def run_batch(nodes_path, queries_path, out_path, method, width=None, workers=None, chunk_rows=CHUNK_ROWS,
+              series=False):
+    data = stream_csv(nodes_path, series=series)
+    if len(data.xs) < 2:
+        raise ValueError("Нужно минимум 2 узла")
+    xs, ys = sort_together(data.xs, data.ys)
+    if np.any(np.diff(xs) == 0):
+        raise ValueError("Узлы x не должны повторяться")
+    workers = workers or os.cpu_count() or 1
+    stats = {"nodes": len(xs), "skipped_nodes": data.skipped, "queries": 0, "skipped_queries": 0}
+
+    def chunks():
+        for values, skipped in stream_column(queries_path, chunk_rows):
+            stats["skipped_queries"] += skipped
+            if values.size:
+                yield values
+
+    # построение и пробное вычисление в родителе: ошибка входных данных — сообщение,
+    # а не сломанный пул (в процессах make_evaluator вызывается из инициализатора);
+    # ленивые evaluate_many/evaluate_series проверяют узлы только при вызове
+    evaluate = make_evaluator(method, xs, ys, width)
+    with np.errstate(all="ignore"):
+        probe = evaluate(xs[:1])
+    if not np.all(np.isfinite(probe)) and np.all(np.isfinite(ys)):
+        # глобальный полином высокой степени: разности переполнились — результат был бы NaN
+        raise ValueError(f"Схема неустойчива на {len(xs)} узлах (значение в узле не конечно), задайте --width")
+
+    with open(out_path, "w", newline="", encoding="utf-8") as out:
+        try:
+            header = ["x"] + ([f"y{j + 1}" for j in range(data.ys.shape[1])] if series else ["y"])
+            out.write(",".join(header) + "\n")
+            if workers == 1:
+                for queries in chunks():
+                    _write_rows(out, queries, evaluate(queries))
+                    stats["queries"] += queries.size
+            else:
+                _run_pool(out, chunks(), stats, xs, ys, series, method, width, workers)
+        except BaseException:
+            # недописанный файл хуже отсутствующего
+            out.close()
+            os.remove(out_path)
+            raise
+    return stats
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="main.py batch", description="Пакетная интерполяция без интерфейса")
+    parser.add_argument("--nodes", required=True, help="CSV с узлами x,y")
+    parser.add_argument("--queries", required=True, help="CSV с точками x (первый столбец)")
+    parser.add_argument("--method", choices=METHODS, default="lagrange")
+    parser.add_argument("--out", required=True, help="куда записать x,y")
+    parser.add_argument("--width", type=int, default=None, help="узлов в локальном шаблоне (по умолчанию все)")
+    parser.add_argument("--workers", type=int, default=None, help="число процессов (по умолчанию по числу ядер)")
+    parser.add_argument("--chunk", type=int, default=CHUNK_ROWS, help="запросов в одной пачке")
+    parser.add_argument("--series", action="store_true", help="все столбцы после x — ряды на общей сетке")
+    return parser
+
+
+def run_cli(argv):
+    args = build_parser().parse_args(argv)
+    start = time.perf_counter()
+    try:
+        stats = run_batch(args.nodes, args.queries, args.out, args.method, args.width or None,
+                          args.workers, max(1, args.chunk), args.series)
+    except (OSError, ValueError, ArithmeticError) as exc:
+        print(f"Ошибка: {exc}", file=sys.stderr)
+        return 1
+    except BrokenProcessPool as exc:
+        print(f"Ошибка: рабочий процесс завершился аварийно ({exc})", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+    print(f"Узлов: {stats['nodes']} (пропущено строк: {stats['skipped_nodes']}), "
+          f"запросов: {stats['queries']} (пропущено: {stats['skipped_queries']}), "
+          f"{elapsed:.3f} с", file=sys.stderr)
+    return 0
@@ -0,0 +1,138 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from batch import make_evaluator
+from methods import FINITE_METHODS, METHODS, finite_cache
+from util import stream_csv
+
+# Бенчмарк methods.py: построение (fit) и вычисление (eval) отдельно для каждой
+# схемы — глобальный полином при небольшом n и локальный шаблон при любом —
+# на разном числе узлов и запросов, плюс разбор CSV разного размера.
+# Результат — JSON {имя: секунды}; с --baseline сравнивается с сохранённым.
+#
+#   python bench.py --json out.json
+#   python bench.py --quick --baseline bench_baseline.json
+#   python bench.py --save-baseline bench_baseline.json
+
+NODES = (8, 32, 128, 1024, 10_000)
+QUERIES = (1, 100, 10_000, 1_000_000)
+CSV_ROWS = (1_000, 100_000, 1_000_000)
+GLOBAL_MAX_N = 128  # дальше глобальный полином на равномерной сетке бессмыслен (и факториалы переполняются)
+LOCAL_WIDTH = 8
+
+
+def measure(fn, repeat=3, budget=0.2):
+    # лучшее из repeat запусков; долгие случаи (> budget) меряются один раз
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        if elapsed > budget:
+            break
+    return best
+
+
+def _fit(method, xs, ys, width):
+    finite_cache.invalidate()
+    evaluate = make_evaluator(method, xs, ys, width)
+    if method in FINITE_METHODS and width is None:
+        finite_cache.get(xs, ys)  # таблица разностей — часть построения
+    return evaluate
+
+
+def bench_methods(nodes=NODES, queries=QUERIES, repeat=3, log=None):
+    results = {}
+    rng = np.random.default_rng(0)
+    query_sets = {m: rng.uniform(0.0, 1.0, m) for m in queries}
+    for n in nodes:
+        xs = np.linspace(0.0, 1.0, n)
+        ys = np.sin(7 * xs)
+        for width in ((None, LOCAL_WIDTH) if n <= GLOBAL_MAX_N else (LOCAL_WIDTH,)):
+            mode = "global" if width is None else f"local{width}"
+            for method in METHODS:
+                name = f"{method}/{mode}/n={n}"
+                results[f"fit/{name}"] = measure(lambda: _fit(method, xs, ys, width), repeat)
+                evaluate = _fit(method, xs, ys, width)
+                for m, q in query_sets.items():
+                    key = f"eval/{name}/m={m}"
+                    results[key] = measure(lambda: evaluate(q), repeat)
+                    if log:
+                        log(key, results[key])
+    return results
+
+
+def bench_csv(rows=CSV_ROWS, repeat=3, log=None):
+    results = {}
+    rng = np.random.default_rng(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in rows:
+            path = os.path.join(tmp, f"nodes_{count}.csv")
+            data = np.column_stack([np.arange(count, dtype=float), rng.normal(size=count)])
+            np.savetxt(path, data, fmt="%.17g", delimiter=",")
+            results[f"csv/parse/rows={count}"] = measure(lambda: stream_csv(path, use_cache=False), repeat)
+            stream_csv(path)  # создаёт кэш рядом с файлом
+            results[f"csv/cached/rows={count}"] = measure(lambda: stream_csv(path), repeat)
+            if log:
+                log(f"csv/rows={count}", results[f"csv/parse/rows={count}"])
+    return results
+
+
+def compare(results, baseline, threshold):
+    # (имя, было, стало, отношение) для общих случаев; регрессия — отношение > threshold
+    rows = []
+    for name in sorted(set(results) & set(baseline)):
+        old, new = baseline[name], results[name]
+        rows.append((name, old, new, new / old if old > 0 else float("inf")))
+    return rows, [row for row in rows if row[3] > threshold]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк схем интерполяции и загрузки CSV")
+    parser.add_argument("--quick", action="store_true", help="меньше узлов и запросов, по одному запуску")
+    parser.add_argument("--json", help="записать результаты в JSON")
+    parser.add_argument("--baseline", help="сравнить с сохранённым JSON")
+    parser.add_argument("--save-baseline", help="сохранить результаты как базовые")
+    parser.add_argument("--threshold", type=float, default=1.25, help="допустимое замедление (во сколько раз)")
+    args = parser.parse_args(argv)
+
+    repeat = 1 if args.quick else 3
+    nodes = NODES[:4] if args.quick else NODES
+    queries = QUERIES[:3] if args.quick else QUERIES
+    rows = CSV_ROWS[:2] if args.quick else CSV_ROWS
+
+    def log(name, seconds):
+        print(f"{name:<45} {seconds * 1e3:12.3f} мс", file=sys.stderr)
+
+    results = bench_methods(nodes, queries, repeat, log)
+    results.update(bench_csv(rows, repeat, log))
+    report = {"meta": {"python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine(),
+                       "platform": platform.platform(), "quick": args.quick},
+              "results": results}
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as fp:
+                json.dump(report, fp, indent=1, sort_keys=True)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding="utf-8") as fp:
+        baseline = json.load(fp)["results"]
+    compared, regressions = compare(results, baseline, args.threshold)
+    for name, old, new, ratio in compared:
+        mark = "  ▲" if ratio > args.threshold else ""
+        print(f"{name:<45} {old * 1e3:10.3f} → {new * 1e3:10.3f} мс  ×{ratio:5.2f}{mark}")
+    print(f"Сравнено: {len(compared)}, замедлений больше ×{args.threshold}: {len(regressions)}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+import numpy as np
+
+from timing import timed
+
+# Интерполяция по узлам Чебышёва второго рода x_j = cos(πj/N), отображённым
+# на [a, b]. Коэффициенты разложения по многочленам T_k дают одно ДКП-I
+# (через rfft чётного продолжения, O(n log n)), значение — рекуррентность
+# Кленшоу за O(n) на точку. В отличие от равномерной сетки ошибка с ростом n
+# только падает, поэтому n можно подбирать под требуемую точность.
+
+MAX_N = (1 << 16) + 1
+
+
+def chebyshev_points(a, b, n):
+    # по возрастанию: первый узел — a, последний — b
+    if n < 2:
+        raise ValueError("Нужно минимум 2 узла")
+    theta = np.pi * np.arange(n - 1, -1, -1) / (n - 1)
+    return (a + b) / 2 + (b - a) / 2 * np.cos(theta)
+
+
+def chebyshev_coefficients(values):
+    # values — значения в chebyshev_points (по возрастанию x)
+    v = np.asarray(values, dtype=float)[::-1]
+    N = len(v) - 1
+    if N < 1:
+        return v.copy()
+    c = np.fft.rfft(np.concatenate([v, v[-2:0:-1]])).real / N
+    c[0] /= 2
+    c[-1] /= 2
+    return c
+
+
+def chebyshev_values(coeffs, n):
+    # обратное к chebyshev_coefficients: значения ряда в chebyshev_points(n),
+    # n − 1 ≥ len(coeffs) − 1; одно ДКП-I, O(n log n) вместо Кленшоу в каждой точке
+    M = n - 1
+    c = np.zeros(n)
+    c[:len(coeffs)] = coeffs
+    v = np.fft.rfft(np.concatenate([c, c[-2:0:-1]])).real
+    v = (v + c[0] + c[M] * np.where(np.arange(n) % 2, -1.0, 1.0)) / 2
+    return v[::-1]
+
+
+def clenshaw(coeffs, t):
+    # Σ c_k T_k(t) без вычисления самих T_k
+    t = np.asarray(t, dtype=float)
+    b1 = np.zeros_like(t)
+    b2 = np.zeros_like(t)
+    t2 = 2 * t
+    for ck in coeffs[:0:-1]:
+        b1, b2 = t2 * b1 - b2 + ck, b1
+    return t * b1 - b2 + coeffs[0]
+
+
+class ChebyshevInterpolant:
+    def __init__(self, a, b, values, coeffs=None):
+        if not a < b:
+            raise ValueError("Требуется a < b")
+        self.a = float(a)
+        self.b = float(b)
+        self.ys = np.asarray(values, dtype=float)
+        self.xs = chebyshev_points(self.a, self.b, len(self.ys))
+        self.coeffs = chebyshev_coefficients(self.ys) if coeffs is None else coeffs
+        # заполняются в from_function при подборе n: достигнута ли точность и
+        # относительная ошибка в серединах последней сетки (None — n задано явно)
+        self.converged = None
+        self.error = None
+
+    @classmethod
+    @timed("chebyshev.fit")
+    def from_function(cls, f, a, b, n=None, tol=1e-13, max_n=MAX_N):
+        # f считает массив значений сразу. Если n не задано, N удваивается, пока
+        # интерполянт по N+1 узлам не совпадёт с f в N новых серединах (они всё
+        # равно нужны для следующей сетки) и хвост коэффициентов не станет
+        # меньше tol·max|f|. Упёрлись в max_n — converged = False
+        if n is not None:
+            return cls(a, b, _sample(f, chebyshev_points(a, b, n)))
+        N = 16
+        values = _sample(f, chebyshev_points(a, b, N + 1))
+        c = chebyshev_coefficients(values)
+        converged, error = False, None
+        while 2 * N + 1 <= max_n:
+            mid = _sample(f, chebyshev_points(a, b, 2 * N + 1)[1::2])
+            scale = max(np.abs(values).max(), np.abs(mid).max()) or 1.0
+            error = np.abs(chebyshev_values(c, 2 * N + 1)[1::2] - mid).max() / scale
+            merged = np.empty(2 * N + 1)
+            merged[0::2] = values
+            merged[1::2] = mid
+            values = merged
+            N *= 2
+            c = chebyshev_coefficients(values)
+            if error <= tol and np.abs(c[-8:]).max() <= tol * scale:
+                converged = True
+                break
+        # хвост, суммарно не превышающий tol·max|f|, на значения не влияет — отбрасываем
+        scale = np.abs(values).max() or 1.0
+        keep = np.flatnonzero(np.cumsum(np.abs(c[::-1]))[::-1] > tol * scale)
+        fit = cls(a, b, values, c[:keep[-1] + 1] if keep.size else c[:1])
+        fit.converged, fit.error = converged, error
+        return fit
+
+    def _t(self, x):
+        return (2 * np.asarray(x, dtype=float) - (self.a + self.b)) / (self.b - self.a)
+
+    def __call__(self, x):
+        return float(clenshaw(self.coeffs, self._t(x)))
+
+    @timed("chebyshev.eval")
+    def many(self, queries):
+        return clenshaw(self.coeffs, self._t(queries))
+
+
+def _sample(f, x):
+    values = np.asarray(f(x), dtype=float)
+    if not np.all(np.isfinite(values)):
+        raise ValueError("Функция не определена в части узлов")
+    return values
@@ -1,8 +1,72 @@
-from math import sin, cos, exp, log
+import ast
+from functools import lru_cache
 
-BUILTIN_FUNCTIONS = {
-    "sin(x)": sin,
-    "cos(x)": cos,
-    "exp(x)": exp,
-    "ln(1 + x)": lambda x: log(1 + x)
+import numpy as np
+
+# Пользовательские функции f(x): выражение разбирается в AST, разрешены только
+# x, числа, константы, арифметика и функции из белого списка. Результат —
+# функция от массива x, каждая операция — одна ufunc NumPy над всем массивом.
+
+_FUNCS = {
+    "sin": np.sin, "cos": np.cos, "tan": np.tan,
+    "asin": np.arcsin, "acos": np.arccos, "atan": np.arctan,
+    "sinh": np.sinh, "cosh": np.cosh, "tanh": np.tanh,
+    "exp": np.exp, "ln": np.log, "log": np.log, "log10": np.log10, "log2": np.log2,
+    "sqrt": np.sqrt, "abs": np.abs, "sign": np.sign, "floor": np.floor, "ceil": np.ceil,
 }
+_CONSTS = {"pi": np.pi, "e": np.e}
+_BINOPS = {ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.true_divide,
+           ast.Pow: np.power, ast.Mod: np.mod}
+_UNARY = {ast.USub: np.negative, ast.UAdd: np.positive}
+
+
+def _build(node):
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINOPS:
+        op, left, right = _BINOPS[type(node.op)], _build(node.left), _build(node.right)
+        return lambda x: op(left(x), right(x))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY:
+        op, arg = _UNARY[type(node.op)], _build(node.operand)
+        return lambda x: op(arg(x))
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in _FUNCS:
+            raise ValueError(f"Неизвестная функция: {ast.unparse(node.func)}")
+        if len(node.args) != 1 or node.keywords:
+            raise ValueError(f"{node.func.id}: нужен ровно один аргумент")
+        fn, arg = _FUNCS[node.func.id], _build(node.args[0])
+        return lambda x: fn(arg(x))
+    if isinstance(node, ast.Name):
+        if node.id == "x":
+            return lambda x: x
+        if node.id in _CONSTS:
+            value = _CONSTS[node.id]
+            return lambda x: value
+        raise ValueError(f"Неизвестное имя: {node.id}")
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        value = float(node.value)
+        return lambda x: value
+    raise ValueError(f"Недопустимая конструкция: {ast.unparse(node)}")
+
+
+@lru_cache(maxsize=128)
+def compile_expression(text: str):
+    # "x**2*sin(3*x)" (или x^2*sin(3x) с ^) -> f(x) над массивами; кэш по тексту
+    try:
+        tree = ast.parse(text.strip().replace("^", "**"), mode="eval")
+    except SyntaxError:
+        raise ValueError(f"Не удалось разобрать выражение: {text}") from None
+    body = _build(tree.body)
+
+    def f(x):
+        x = np.asarray(x, dtype=float)
+        with np.errstate(all="ignore"):  # вне области определения — NaN, а не исключение
+            return np.broadcast_to(body(x), x.shape).astype(float)
+
+    f.expression = text
+    return f
+
+
+BUILTIN_FUNCTIONS = {name: compile_expression(name) for name in ("sin(x)", "cos(x)", "exp(x)", "ln(1 + x)")}
+
+
+def make_function(text: str):
+    return BUILTIN_FUNCTIONS.get(text) or compile_expression(text.strip())
@@ -1,11 +1,57 @@
 import sys
-from PyQt5 import QtWidgets
-from UI import InterpolationWindow
+import time
+
+_T0 = time.perf_counter()
+
+
+def _startup_report(app, win, marks):
+    # --startup-time: этапы запуска от старта main.py, выход после построения холста
+    from PyQt5 import QtCore
+
+    class FirstPaint(QtCore.QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QtCore.QEvent.Paint and "первая отрисовка" not in marks:
+                marks["первая отрисовка"] = time.perf_counter()
+            return False
+
+    def done():
+        marks["холст (matplotlib)"] = time.perf_counter()
+        prev = _T0
+        for stage, t in sorted(marks.items(), key=lambda item: item[1]):
+            print(f"{stage:<22} {(t - prev) * 1e3:8.1f} мс   (от старта {(t - _T0) * 1e3:8.1f} мс)", file=sys.stderr)
+            prev = t
+        app.quit()
+
+    spy = FirstPaint(win)
+    win.installEventFilter(spy)
+    win.canvas_ready.connect(done)
 
 
 def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    # пакетный режим и сервис: Qt и matplotlib не импортируются вовсе
+    if command == "batch":
+        from batch import run_cli
+        sys.exit(run_cli(sys.argv[2:]))
+    if command == "serve":
+        from service import run_serve
+        sys.exit(run_serve(sys.argv[2:]))
+    if command == "client":
+        from service import run_client
+        sys.exit(run_client(sys.argv[2:]))
+
+    startup = command == "--startup-time"
+    marks = {}
+    from PyQt5 import QtWidgets
+    marks["импорт PyQt5"] = time.perf_counter()
+    from UI import InterpolationWindow
+    marks["импорт UI"] = time.perf_counter()
+
     app = QtWidgets.QApplication(sys.argv)
     win = InterpolationWindow()
+    marks["окно построено"] = time.perf_counter()
+    if startup:
+        _startup_report(app, win, marks)
     win.show()
     sys.exit(app.exec_())
 
@@ -1,36 +1,258 @@
-from math import factorial
+from collections import OrderedDict, namedtuple
+from hashlib import blake2b
+from threading import Lock
+
+import numpy as np
+
+from timing import timed
+
+
+class LagrangeInterpolant:
+    # барицентрическая форма: веса считаются один раз, значение — за O(n)
+    @timed("lagrange.fit")
+    def __init__(self, xs, ys):
+        n = len(xs)
+        if n != len(ys):
+            raise ValueError("Массивы должны быть одной длины")
+        self.xs = list(xs)
+        self.ys = list(ys)
+        # масштаб 4/(b-a) удерживает произведения разностей от пере-/недополнения
+        span = max(self.xs) - min(self.xs) if n > 1 else 0.0
+        scale = 4.0 / span if span > 0 else 1.0
+        weights = []
+        for i in range(n):
+            w = 1.0
+            for j in range(n):
+                if i != j:
+                    denom = self.xs[i] - self.xs[j]
+                    if denom == 0:
+                        raise ZeroDivisionError("Повторяющиеся узлы интерполяции")
+                    w *= denom * scale
+            weights.append(1.0 / w)
+        self.weights = weights
+
+    def __call__(self, x):
+        if not self.xs:
+            return 0.0
+        num = 0.0
+        den = 0.0
+        for xi, yi, wi in zip(self.xs, self.ys, self.weights):
+            d = x - xi
+            if d == 0:
+                return yi
+            c = wi / d
+            num += c * yi
+            den += c
+        return num / den
+
+    @timed("lagrange.eval")
+    def many(self, queries):
+        shape = np.shape(queries)
+        q = np.atleast_1d(np.asarray(queries, dtype=float))
+        if not self.xs:
+            return np.zeros(shape)
+        num = np.zeros_like(q)
+        den = np.zeros_like(q)
+        exact = np.full(q.shape, -1, dtype=np.intp)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for i, (xi, wi) in enumerate(zip(self.xs, self.weights)):
+                d = q - xi
+                exact[d == 0] = i
+                c = wi / d
+                num += c * self.ys[i]
+                den += c
+            res = num / den
+        hit = exact >= 0
+        res[hit] = np.asarray(self.ys, dtype=float)[exact[hit]]
+        return res.reshape(shape)
 
 
 def lagrange_interpolate(x, xs, ys):
-    n = len(xs)
-    res = 0.0
-    for i in range(n):
-        term = ys[i]
-        for j in range(n):
-            if i != j:
-                denom = xs[i] - xs[j]
-                if denom == 0:
-                    raise ZeroDivisionError("Повторяющиеся узлы интерполяции")
-                term *= (x - xs[j]) / denom
-        res += term
-    return res
+    return LagrangeInterpolant(xs, ys)(x)
+
+
+###############################################################################
+# Равномерная сетка                                                           #
+###############################################################################
+
+class UniformGrid:
+    # узлы x0 + i*h, i = 0…n-1: хранятся три числа, проверка шага и поиск
+    # соседнего узла (position) — арифметика за O(1)
+    def __init__(self, x0, h, n):
+        if n < 0:
+            raise ValueError("Число узлов должно быть неотрицательным")
+        if n > 1 and h <= 0:
+            raise ValueError("Шаг сетки должен быть положительным")
+        self.x0 = float(x0)
+        self.h = float(h)
+        self.n = int(n)
+
+    @classmethod
+    def from_bounds(cls, a, b, n):
+        return cls(a, (b - a) / (n - 1) if n > 1 else 0.0, n)
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.n)
+            return UniformGrid(self.x0 + start * self.h, self.h * step, len(range(start, stop, step)))
+        if key < 0:
+            key += self.n
+        if not 0 <= key < self.n:
+            raise IndexError(key)
+        return self.x0 + key * self.h
+
+    def __iter__(self):
+        return (self.x0 + i * self.h for i in range(self.n))
+
+    def __array__(self, dtype=None, copy=None):
+        return (self.x0 + np.arange(self.n) * self.h).astype(dtype or float, copy=False)
+
+    def __repr__(self):
+        return f"UniformGrid(x0={self.x0!r}, h={self.h!r}, n={self.n})"
+
+    def position(self, x):
+        # дробный номер узла: целая часть — левый сосед x
+        return (np.asarray(x, dtype=float) - self.x0) / self.h
+
+
+###############################################################################
+# Таблицы разностей                                                           #
+###############################################################################
+
+class DiffTable:
+    # треугольник разностей в одном плоском массиве: уровень k (n-k ячеек)
+    # начинается со смещения k*n - k*(k-1)/2; table[k] — срез без копирования.
+    # depth ограничивает число хранимых уровней (для локальных шаблонов),
+    # shape — форма ячейки: () для одного ряда, (k,) для k рядов сразу
+    def __init__(self, n, depth=None, shape=()):
+        self.n = n
+        self.depth = n if depth is None else max(0, min(depth, n))
+        self.data = np.empty((self._offset(self.depth),) + tuple(shape))
+
+    def _offset(self, level):
+        return level * self.n - level * (level - 1) // 2
+
+    def __len__(self):
+        return self.depth
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            level, i = key
+            return self[level][i]
+        if key < 0:
+            key += self.depth
+        if not 0 <= key < self.depth:
+            raise IndexError(key)
+        off = self._offset(key)
+        return self.data[off:off + self.n - key]
+
+
+class _SparseLevel:
+    def __init__(self, length, values):
+        self.length = length
+        self.values = values
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.length
+        try:
+            return self.values[i]
+        except KeyError:
+            raise IndexError(i) from None
+
+
+class DiffDiagonals:
+    # потоковый режим: уровни считаются по одному, сохраняются только ячейки,
+    # к которым обращаются Ньютон (вперёд/назад), Стирлинг и Бессель — O(n) памяти
+    def __init__(self, ys):
+        level = np.array(ys, dtype=float)
+        self.n = n = len(level)
+        self.levels = [level]
+        for k in range(1, n):
+            level = np.diff(level, axis=0)
+            self.levels.append(_SparseLevel(len(level), {i: level[i] for i in _needed_indices(n, k)}))
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            level, i = key
+            return self[level][i]
+        return self.levels[key]
+
+
+def _needed_indices(n, k):
+    length = n - k
+    centre = length // 2
+    idx = {0, length - 1, centre, centre - (1 - length % 2)}
+    m = n // 2 - 1
+    order = k // 2
+    if k == 1:
+        idx.add(m)
+    elif k % 2 == 0:
+        idx.update((m - order, m - order + 1))
+    else:
+        idx.add(m - order)
+    return [i for i in idx if 0 <= i < length]
+
+
+@timed("table.finite")
+def finite_differences(ys, full=True, depth=None):
+    if not full and depth is None:
+        return DiffDiagonals(ys)
+    level = np.asarray(ys, dtype=float)
+    table = DiffTable(len(level), None if full else depth, level.shape[1:])
+    table[0][:] = level
+    for k in range(1, table.depth):
+        prev = table[k - 1]
+        np.subtract(prev[1:], prev[:-1], out=table[k])
+    return table
 
 
+@timed("table.divided")
 def divided_differences(xs, ys):
-    n = len(xs)
-    table = [ys.copy()]
-    for lvl in range(1, n):
-        prev = table[-1]
-        curr = []
-        for i in range(n - lvl):
-            denom = xs[i + lvl] - xs[i]
-            if denom == 0:
-                raise ZeroDivisionError("Повторяющиеся узлы интерполяции")
-            curr.append((prev[i + 1] - prev[i]) / denom)
-        table.append(curr)
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    table = DiffTable(len(xs), shape=ys.shape[1:])
+    table[0][:] = ys
+    for k in range(1, table.n):
+        denom = xs[k:] - xs[:-k]
+        if not denom.all():
+            raise ZeroDivisionError("Повторяющиеся узлы интерполяции")
+        denom = denom.reshape((-1,) + (1,) * (ys.ndim - 1))
+        prev = table[k - 1]
+        np.divide(prev[1:] - prev[:-1], denom, out=table[k])
     return table
 
 
+def update_differences(table, i, value=None, xs=None):
+    # правка узла i меняет на уровне k только полосу ячеек i-k…i, поэтому
+    # таблица обновляется за O(k) на уровень вместо полного пересчёта.
+    # value — новое y_i (None, если менялся только x_i); xs — для разделённых
+    if value is not None:
+        table[0][i] = value
+    if xs is not None:
+        xs = np.asarray(xs, dtype=float)
+    for k in range(1, len(table)):
+        lo, hi = max(0, i - k), min(i, table.n - k - 1)
+        prev, level = table[k - 1], table[k]
+        if xs is None:
+            np.subtract(prev[lo + 1:hi + 2], prev[lo:hi + 1], out=level[lo:hi + 1])
+            continue
+        denom = xs[lo + k:hi + k + 1] - xs[lo:hi + 1]
+        if not denom.all():
+            raise ZeroDivisionError("Повторяющиеся узлы интерполяции")
+        denom = denom.reshape((-1,) + (1,) * (prev.ndim - 1))
+        np.divide(prev[lo + 1:hi + 2] - prev[lo:hi + 1], denom, out=level[lo:hi + 1])
+
+
 def newton_divided(x, xs, ys):
     table = divided_differences(xs, ys)
     res = table[0][0]
@@ -41,18 +263,69 @@ def newton_divided(x, xs, ys):
     return res, table
 
 
-def finite_differences(ys):
-    table = [ys.copy()]
-    while len(table[-1]) > 1:
-        prev = table[-1]
-        lst = []
-        for i in range(len(prev) - 1):
-            lst.append(prev[i + 1] - prev[i])
-        table.append(lst)
-    return table
+class NewtonInterpolant:
+    # хранит только диагональ f[x0], f[x0,x1], … и нижнюю строку таблицы,
+    # поэтому добавление узла стоит O(n), а значение считается по Горнеру
+    @timed("divided.fit")
+    def __init__(self, xs=(), ys=()):
+        if len(xs) != len(ys):
+            raise ValueError("Массивы должны быть одной длины")
+        self.xs = []
+        self.coeffs = []
+        self._tail = []  # f[x_n], f[x_{n-1},x_n], …, f[x_0..x_n]
+        for x, y in zip(xs, ys):
+            self.append(x, y)
+
+    def append(self, x, y):
+        tail = [y]
+        n = len(self.xs)
+        for k in range(1, n + 1):
+            denom = x - self.xs[n - k]
+            if denom == 0:
+                raise ZeroDivisionError("Повторяющиеся узлы интерполяции")
+            tail.append((tail[k - 1] - self._tail[k - 1]) / denom)
+        self.xs.append(x)
+        self.coeffs.append(tail[-1])
+        self._tail = tail
+
+    @classmethod
+    def from_table(cls, xs, table):
+        # по полной таблице разделённых разностей: диагональ — коэффициенты,
+        # нижняя строка — хвост для append; O(n)
+        other = cls()
+        n = table.n
+        other.xs = [float(x) for x in xs]
+        other.coeffs = [float(table[k][0]) for k in range(n)]
+        other._tail = [float(table[k][n - 1 - k]) for k in range(n)]
+        return other
+
+    def __len__(self):
+        return len(self.xs)
+
+    def copy(self):
+        other = NewtonInterpolant()
+        other.xs, other.coeffs, other._tail = list(self.xs), list(self.coeffs), list(self._tail)
+        return other
+
+    def __call__(self, x):
+        if not self.coeffs:
+            return 0.0
+        res = self.coeffs[-1]
+        for k in range(len(self.coeffs) - 2, -1, -1):
+            res = res * (x - self.xs[k]) + self.coeffs[k]
+        return res
+
+    @timed("divided.eval")
+    def many(self, queries):
+        q = np.asarray(queries, dtype=float)
+        if not self.coeffs:
+            return np.zeros_like(q)
+        return self(q) + np.zeros_like(q)
 
 
 def is_equally_spaced(xs, tol=1e-9):
+    if isinstance(xs, UniformGrid):
+        return xs.n >= 2, xs.h
     xs_sorted = sorted(xs)
     n = len(xs)
     if n < 2:
@@ -64,36 +337,162 @@ def is_equally_spaced(xs, tol=1e-9):
     return True, h
 
 
+###############################################################################
+# Кэш таблиц конечных разностей                                               #
+###############################################################################
+
+FiniteData = namedtuple("FiniteData", "equal h table")
+
+
+def fingerprint(xs, ys):
+    digest = blake2b(digest_size=16)
+    if isinstance(xs, UniformGrid):
+        digest.update(b"grid")
+        digest.update(np.array([xs.x0, xs.h, xs.n], dtype=float).tobytes())
+    else:
+        digest.update(np.asarray(xs, dtype=float).tobytes())
+    digest.update(b"|")
+    digest.update(np.asarray(ys, dtype=float).tobytes())
+    return digest.digest()
+
+
+class FiniteTableCache:
+    # общий для Ньютона (конечные), Стирлинга и Бесселя: проверка шага и таблица
+    # считаются один раз на набор узлов, старые наборы вытесняются по LRU —
+    # и по числу записей, и по суммарному объёму таблиц (maxbytes)
+    def __init__(self, maxsize=32, maxbytes=256 << 20):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @timed("cache.get")
+    def get(self, xs, ys, full=False, depth=None):
+        # по умолчанию хранятся только нужные схемам диагонали; depth уровней
+        # нужны локальным шаблонам, полная таблица — для показа. При неравном
+        # шаге глобальной таблице незачем строиться: схемы её не примут
+        key = fingerprint(xs, ys)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and _table_covers(entry, full, depth):
+                self.hits += 1
+                self._data.move_to_end(key)
+                return entry
+            self.misses += 1
+        # таблица строится вне блокировки: другие потоки в это время не ждут
+        if entry is not None:
+            equal, h = entry.equal, entry.h
+            if not equal and depth is None:
+                return entry  # таблица шаблонов остаётся, глобальная всё равно не нужна
+        else:
+            equal, h = is_equally_spaced(xs)
+        table = finite_differences(ys, full=full, depth=depth) if equal or depth is not None else None
+        entry = FiniteData(equal, h, table)
+        with self._lock:
+            self._put(key, entry)
+        return entry
+
+    def _put(self, key, entry):
+        old = self._data.pop(key, None)
+        if old is not None:
+            self._bytes -= _table_nbytes(old.table)
+        self._data[key] = entry
+        self._bytes += _table_nbytes(entry.table)
+        # последняя запись остаётся, даже если одна превышает maxbytes
+        while len(self._data) > self.maxsize or (self._bytes > self.maxbytes and len(self._data) > 1):
+            _, evicted = self._data.popitem(last=False)
+            self._bytes -= _table_nbytes(evicted.table)
+            self.evictions += 1
+
+    def update_node(self, xs, ys, i, value):
+        # вызывается до правки ys[i]: таблица не строится заново, а обновляется
+        # полосой (update_differences) и переходит под ключ новых узлов
+        new_ys = np.array(ys, dtype=float)
+        new_ys[i] = value
+        with self._lock:
+            entry = self._data.pop(fingerprint(xs, ys), None)
+            if entry is not None:
+                self._bytes -= _table_nbytes(entry.table)
+        if entry is None or not isinstance(entry.table, DiffTable):
+            return
+        update_differences(entry.table, i, value)
+        with self._lock:
+            self._put(fingerprint(xs, new_ys), entry)
+
+    def invalidate(self, xs=None, ys=None):
+        with self._lock:
+            if xs is None:
+                self._data.clear()
+                self._bytes = 0
+            else:
+                entry = self._data.pop(fingerprint(xs, ys), None)
+                if entry is not None:
+                    self._bytes -= _table_nbytes(entry.table)
+
+    def stats(self):
+        return {"size": len(self._data), "maxsize": self.maxsize, "bytes": self._bytes,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+def _table_covers(entry, full, depth):
+    table = entry.table
+    if table is None:
+        return not entry.equal and depth is None  # неравный шаг: глобальной таблицы не будет
+    if isinstance(table, DiffDiagonals):
+        return not full and depth is None
+    return table.depth >= (table.n if full or depth is None else depth)
+
+
+def _table_nbytes(table):
+    if table is None:
+        return 0
+    if isinstance(table, DiffTable):
+        return table.data.nbytes
+    return table.levels[0].nbytes + sum(np.asarray(v).nbytes for level in table.levels[1:]
+                                        for v in level.values.values())
+
+
+finite_cache = FiniteTableCache()
+
+
+def _finite_data(xs, ys, error, depth=None):
+    data = finite_cache.get(xs, ys, depth=depth)
+    if not data.equal:
+        raise ValueError(error)
+    return data
+
+
 def newton_forward(x, xs, ys, h):
-    table = finite_differences(ys)
+    table = finite_cache.get(xs, ys).table
     t = (x - xs[0]) / h
     res = ys[0]
     prod = 1.0
-    fact = 1
     for k in range(1, len(xs)):
-        prod *= (t - (k - 1))
-        fact *= k
-        res += (prod / fact) * table[k][0]
+        prod *= (t - (k - 1)) / k  # t(t−1)…/k! копится сразу: k! в float не помещается при k > 170
+        res += prod * table[k][0]
     return res, table
 
 
 def newton_backward(x, xs, ys, h):
-    table = finite_differences(ys)
+    table = finite_cache.get(xs, ys).table
     t = (x - xs[-1]) / h
     res = ys[-1]
     prod = 1.0
-    fact = 1
     for k in range(1, len(xs)):
-        prod *= (t + (k - 1))
-        fact *= k
-        res += (prod / fact) * table[k][-1]
+        prod *= (t + (k - 1)) / k
+        res += prod * table[k][-1]
     return res, table
 
 
-def newton_finite(x, xs, ys):
-    eq, h = is_equally_spaced(xs)
-    if not eq:
-        raise ValueError("Нерегулярная сетка для конечных разностей")
+def newton_finite(x, xs, ys, width=None):
+    if _stencil(len(xs), width) < len(xs):
+        form = "вперёд" if abs(x - xs[0]) <= abs(x - xs[-1]) else "назад"
+        return float(newton_finite_many(x, xs, ys, width)), finite_cache.get(xs, ys, depth=width).table, form
+    h = _finite_data(xs, ys, "Нерегулярная сетка для конечных разностей").h
 
     if abs(x - xs[0]) <= abs(x - xs[-1]):  # вперёд
         y_f, table_fin = newton_forward(x, xs, ys, h)
@@ -105,20 +504,17 @@ def newton_finite(x, xs, ys):
     return y_f, table_fin, form
 
 
-def stirling_interpolate(x, xs, ys):
-    equal, h = is_equally_spaced(xs)
-    if not equal:
-        raise ValueError("Стирлинг работает только при равном шаге")
-
-    table_fin = finite_differences(ys)
+def stirling_interpolate(x, xs, ys, width=None):
+    if _stencil(len(xs), width) < len(xs):
+        return float(stirling_many(x, xs, ys, width)), finite_cache.get(xs, ys, depth=width).table
+    _, h, table_fin = _finite_data(xs, ys, "Стирлинг работает только при равном шаге")
     n = len(xs) - 1
     alpha = n // 2
     t = (x - xs[alpha]) / h
     s1 = ys[alpha]
     s2 = ys[alpha]
-    prod1 = 1
-    prod2 = 1
-    fact = 1
+    prod1 = 1.0
+    prod2 = 1.0
 
     shifts = [0]
     for i in range(1, n + 1):
@@ -126,11 +522,10 @@ def stirling_interpolate(x, xs, ys):
     shifts = shifts[:n]
 
     for k in range(1, n + 1):
-        fact *= k
         shift = shifts[k - 1]
 
-        prod1 *= t + shift
-        prod2 *= t - shift
+        prod1 *= (t + shift) / k
+        prod2 *= (t - shift) / k
 
         idx_c = len(table_fin[k]) // 2
         delta_c = table_fin[k][idx_c]
@@ -138,18 +533,16 @@ def stirling_interpolate(x, xs, ys):
         idx_s = idx_c - (1 - len(table_fin[k]) % 2)
         delta_s = table_fin[k][idx_s]
 
-        s1 += prod1 * delta_c / fact
-        s2 += prod2 * delta_s / fact
+        s1 += prod1 * delta_c
+        s2 += prod2 * delta_s
 
     return (s1 + s2) / 2, table_fin
 
 
-def bessel_interpolate(x, xs, ys):
-    equal, h = is_equally_spaced(xs)
-    if not equal:
-        raise ValueError("Бессель работает только при равном шаге")
-
-    table_fin = finite_differences(ys)
+def bessel_interpolate(x, xs, ys, width=None):
+    if _stencil(len(xs), width) < len(xs):
+        return float(bessel_many(x, xs, ys, width)), finite_cache.get(xs, ys, depth=width).table
+    _, h, table_fin = _finite_data(xs, ys, "Бессель работает только при равном шаге")
 
     n = len(xs)
     m = n // 2 - 1
@@ -182,3 +575,434 @@ def bessel_interpolate(x, xs, ys):
         order += 1
 
     return y, table_fin
+
+
+###############################################################################
+# Пакетное вычисление: все запросы одним массивом                             #
+###############################################################################
+
+# Схемы с конечными разностями работают на шаблоне из size узлов, начиная
+# с узла base. Без width шаблон — вся таблица (base = 0), с width для каждого
+# запроса выбирается ближайший к нему шаблон (см. LocalInterpolant ниже),
+# а разности берутся из первых width уровней таблицы.
+
+def _stencil(n, width):
+    if width is None or width >= n:
+        return n
+    if width < 2:
+        raise ValueError("Шаблон должен содержать хотя бы 2 узла")
+    return width
+
+
+def _node(xs, h, i):
+    if np.ndim(i) == 0:
+        return xs[int(i)]
+    if isinstance(xs, np.ndarray):
+        return xs[i]
+    return xs[0] + i * h
+
+
+def _forward_core(q, xs, h, table, base, size):
+    t = (q - _node(xs, h, base)) / h
+    res = table[0][base] + np.zeros_like(t)
+    prod = np.ones_like(t)
+    for k in range(1, size):
+        prod *= (t - (k - 1)) / k
+        res += prod * table[k][base]
+    return res
+
+
+def _backward_core(q, xs, h, table, base, size):
+    end = base + size - 1
+    t = (q - _node(xs, h, end)) / h
+    res = table[0][end] + np.zeros_like(t)
+    prod = np.ones_like(t)
+    for k in range(1, size):
+        prod *= (t + (k - 1)) / k
+        res += prod * table[k][end - k]
+    return res
+
+
+def _stirling_core(q, xs, h, table, base, size):
+    n = size - 1
+    alpha = n // 2
+    t = (q - _node(xs, h, base + alpha)) / h
+    s1 = table[0][base + alpha] + np.zeros_like(t)
+    s2 = s1.copy()
+    prod1 = np.ones_like(t)
+    prod2 = np.ones_like(t)
+
+    shifts = [0]
+    for i in range(1, n + 1):
+        shifts.extend([-i, i])
+    shifts = shifts[:n]
+
+    for k in range(1, n + 1):
+        shift = shifts[k - 1]
+        prod1 *= (t + shift) / k
+        prod2 *= (t - shift) / k
+        idx_c = (size - k) // 2
+        idx_s = idx_c - (1 - (size - k) % 2)
+        s1 += prod1 * table[k][base + idx_c]
+        s2 += prod2 * table[k][base + idx_s]
+
+    return (s1 + s2) / 2
+
+
+def _bessel_core(q, xs, h, table, base, size):
+    m = size // 2 - 1
+    t = (q - _node(xs, h, base + m)) / h
+    y = (table[0][base + m] + table[0][base + m + 1]) / 2 + (t - 0.5) * table[1][base + m]
+    even_coeff = t * (t - 1) / 2
+    odd_coeff = (t - 0.5) * t * (t - 1) / 6
+
+    order = 1
+    while True:
+        i_even = 2 * order
+        i_odd = i_even + 1
+        if i_even < size:
+            i_left = m - order
+            i_right = i_left + 1
+            if 0 <= i_left and i_right < size - i_even:
+                y += even_coeff * (table[i_even][base + i_left] + table[i_even][base + i_right]) / 2
+        if i_odd < size:
+            idx = m - order
+            if 0 <= idx < size - i_odd:
+                y += odd_coeff * table[i_odd][base + idx]
+
+        if (i_even >= size and i_odd >= size) or m - order - 1 < 0:
+            break
+
+        even_coeff = even_coeff * (t + order) * (t - order - 1) / ((2 * order + 2) * (2 * order + 1))
+        odd_coeff = odd_coeff * (t + order) * (t - order - 1) / ((2 * order + 3) * (2 * order + 2))
+        order += 1
+
+    return y
+
+
+_FINITE_ERRORS = {
+    "finite": "Нерегулярная сетка для конечных разностей",
+    "stirling": "Стирлинг работает только при равном шаге",
+    "bessel": "Бессель работает только при равном шаге",
+}
+
+
+@timed("finite.eval")
+def newton_finite_many(q, xs, ys, width=None):
+    if _stencil(len(xs), width) < len(xs):
+        return LocalInterpolant(xs, ys, "finite", width).many(q)
+    _, h, table = _finite_data(xs, ys, _FINITE_ERRORS["finite"])
+    forward = np.abs(q - xs[0]) <= np.abs(q - xs[-1])
+    return np.where(forward,
+                    _forward_core(q, xs, h, table, 0, len(xs)),
+                    _backward_core(q, xs, h, table, 0, len(xs)))
+
+
+@timed("stirling.eval")
+def stirling_many(q, xs, ys, width=None):
+    if _stencil(len(xs), width) < len(xs):
+        return LocalInterpolant(xs, ys, "stirling", width).many(q)
+    _, h, table = _finite_data(xs, ys, _FINITE_ERRORS["stirling"])
+    return _stirling_core(q, xs, h, table, 0, len(xs))
+
+
+@timed("bessel.eval")
+def bessel_many(q, xs, ys, width=None):
+    if _stencil(len(xs), width) < len(xs):
+        return LocalInterpolant(xs, ys, "bessel", width).many(q)
+    _, h, table = _finite_data(xs, ys, _FINITE_ERRORS["bessel"])
+    return _bessel_core(q, xs, h, table, 0, len(xs))
+
+
+_MANY = {
+    "lagrange": lambda q, xs, ys: LagrangeInterpolant(xs, ys).many(q),
+    "divided": lambda q, xs, ys: NewtonInterpolant(xs, ys).many(q),
+    "finite": newton_finite_many,
+    "stirling": stirling_many,
+    "bessel": bessel_many,
+}
+
+METHODS = tuple(_MANY)
+FINITE_METHODS = ("finite", "stirling", "bessel")
+
+
+def evaluate_many(method, xs, ys, queries, width=None):
+    if method not in _MANY:
+        raise ValueError(f"Неизвестный метод: {method}")
+    if len(xs) != len(ys):
+        raise ValueError("Массивы должны быть одной длины")
+    if np.ndim(ys) > 1:
+        return evaluate_series(method, xs, ys, queries, width)
+    q = np.asarray(queries, dtype=float)
+    if _stencil(len(xs), width) < len(xs):
+        return LocalInterpolant(xs, ys, method, width).many(q)
+    if not isinstance(xs, UniformGrid):
+        xs = list(xs)
+    return _MANY[method](q, xs, list(ys))
+
+
+###############################################################################
+# Несколько рядов на общей сетке                                              #
+###############################################################################
+
+# Все схемы линейны по y: y(q) = B(q) @ ys, где матрица B зависит только от
+# узлов и точек запроса. Веса, проверка шага и произведения по t считаются
+# один раз, а ряды (столбцы матрицы ys) получаются одним матричным умножением.
+
+_FINITE_CORES = {"stirling": _stirling_core, "bessel": _bessel_core}
+
+
+def _finite_series(method, xs, series, q):
+    # конечные схемы: ядра считаются прямо по таблице разностей рядов (ячейка —
+    # вектор из k значений), множители по t на каждом уровне общие для всех рядов;
+    # память O(n²·k) вместо таблицы единичной матрицы O(n³)
+    equal, h = is_equally_spaced(xs)
+    if not equal:
+        raise ValueError(_FINITE_ERRORS[method])
+    n = len(xs)
+    table = finite_differences(series)
+    qc = q[:, None]
+    if method in _FINITE_CORES:
+        return _FINITE_CORES[method](qc, xs, h, table, 0, n)
+    forward = np.abs(qc - xs[0]) <= np.abs(qc - xs[-1])
+    return np.where(forward, _forward_core(qc, xs, h, table, 0, n), _backward_core(qc, xs, h, table, 0, n))
+
+
+@timed("series.basis")
+def basis_matrix(method, xs, queries):
+    # матрица (m, n) глобальной схемы Лагранжа/Ньютона: строка — веса узлов для
+    # одной точки. Конечным схемам она обошлась бы в O(n³) памяти (таблица
+    # разностей единичной матрицы) — они считаются по таблице рядов, _finite_series
+    if method not in _MANY:
+        raise ValueError(f"Неизвестный метод: {method}")
+    if method in _FINITE_ERRORS:
+        raise ValueError(f"Матрица весов для схемы {method} не строится, используйте evaluate_series")
+    q = np.atleast_1d(np.asarray(queries, dtype=float)).ravel()
+    n = len(xs)
+    x = np.asarray(xs, dtype=float)
+    if np.unique(x).size != n:
+        raise ZeroDivisionError("Повторяющиеся узлы интерполяции")
+    if method == "divided":
+        coef = _window_newton(np.broadcast_to(x, (n, n)), np.eye(n))  # строка j — коэффициенты для y = e_j
+        prods = np.ones((q.size, n))
+        np.cumprod(q[:, None] - x[None, :-1], axis=1, out=prods[:, 1:])
+        return prods @ coef.T
+    d = q[:, None] - x
+    exact = d == 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        c = _window_weights(x[None, :]) / d
+        basis = c / c.sum(axis=1, keepdims=True)
+    hit = exact.any(axis=1)
+    basis[hit] = exact[hit]
+    return basis
+
+
+def _series_values(method, xs, series, q):
+    if method in _FINITE_ERRORS:
+        return _finite_series(method, xs, series, q)
+    return basis_matrix(method, xs, q) @ series
+
+
+@timed("series.eval")
+def evaluate_series(method, xs, ys, queries, width=None):
+    # ys — матрица (n, k): k рядов на общих узлах; результат (*queries.shape, k)
+    ys = np.asarray(ys, dtype=float)
+    n = len(xs)
+    if n != len(ys):
+        raise ValueError("Массивы должны быть одной длины")
+    series = ys.reshape(n, -1)
+    q = np.asarray(queries, dtype=float)
+    shape = q.shape
+    q = q.ravel()
+    if _stencil(n, width) >= n:
+        out = _series_values(method, xs, series, q)
+    else:
+        # окна выбираются как у LocalInterpolant; одно окно — одна матрица весов
+        local = LocalInterpolant(xs, np.zeros(n), method, width)
+        starts = local._starts(q, local._left(q, False))
+        order = np.argsort(starts, kind="stable")
+        bounds = np.flatnonzero(np.diff(starts[order])) + 1
+        out = np.empty((q.size, series.shape[1]))
+        for group in np.split(order, bounds):
+            if not group.size:
+                continue
+            s = int(starts[group[0]])
+            sl = slice(s, s + local.size)
+            out[group] = _series_values(method, xs[sl], series[sl], q[group])
+    return out.reshape(shape + ys.shape[1:])
+
+
+###############################################################################
+# Локальная (кусочная) интерполяция                                           #
+###############################################################################
+
+class LocalInterpolant:
+    # для каждого запроса берётся окно из width соседних узлов (поиск — бисекция
+    # по отсортированным xs или арифметика для UniformGrid), и на нём строится
+    # выбранная схема: O(log n + width) на запрос вместо глобального полинома.
+    # Коэффициенты Лагранжа/Ньютона считаются лениво для каждого окна и
+    # запоминаются; конечным схемам хватает width уровней общей таблицы.
+    _BLOCK = 1 << 20  # ограничение на размер промежуточных матриц (ячеек)
+
+    def __init__(self, xs, ys, method="lagrange", width=8, tol=1e-9):
+        if method not in _MANY:
+            raise ValueError(f"Неизвестный метод: {method}")
+        n = len(xs)
+        if n != len(ys):
+            raise ValueError("Массивы должны быть одной длины")
+        if n < 2:
+            raise ValueError("Нужно минимум 2 узла интерполяции")
+        size = _stencil(n, width)
+        # Стирлингу нужен шаблон из нечётного числа узлов, Бесселю — из чётного
+        parity = {"stirling": 1, "bessel": 0}.get(method)
+        if parity is not None and size < n and size % 2 != parity:
+            size += 1
+        if isinstance(xs, UniformGrid):
+            self.xs = xs
+        else:
+            self.xs = np.asarray(xs, dtype=float)
+            if np.any(np.diff(self.xs) <= 0):
+                raise ValueError("Узлы должны быть отсортированы по возрастанию без повторов")
+        self.ys = np.asarray(ys, dtype=float)
+        self.n = n
+        self.method = method
+        self.size = size
+        self.tol = tol
+        self._coef = None
+        self._fitted = None
+        self._uniform = None
+        self._table = None
+
+    def __call__(self, x):
+        return float(self.many(x))
+
+    @timed("local.eval")
+    def many(self, queries, assume_sorted=False):
+        q = np.asarray(queries, dtype=float)
+        shape = q.shape
+        q = q.ravel()
+        if not assume_sorted:
+            assume_sorted = q.size > 1 and bool(np.all(q[1:] >= q[:-1]))
+        starts = self._starts(q, self._left(q, assume_sorted))
+        if self.method in _FINITE_ERRORS:
+            res = self._eval_finite(q, starts)
+        else:
+            res = self._eval_poly(q, starts)
+        return res.reshape(shape)
+
+    # ---- поиск окна --------------------------------------------------------
+    def _left(self, q, is_sorted):
+        # номер левого соседа: -1 левее первого узла, n-1 правее последнего
+        if isinstance(self.xs, UniformGrid):
+            return np.clip(np.floor(self.xs.position(q)), -1, self.n - 1).astype(np.intp)
+        if is_sorted and q.size >= self.n // 16:
+            # отсортированная пачка: один проход слиянием узлов и запросов
+            marks = np.bincount(np.searchsorted(q, self.xs, side="left"), minlength=q.size + 1)
+            return np.cumsum(marks[:q.size]) - 1
+        return np.searchsorted(self.xs, q, side="right") - 1
+
+    def _starts(self, q, left):
+        size = self.size
+        if self.method == "stirling":
+            # Стирлинг центрируется на ближайшем узле
+            i = np.clip(left, 0, self.n - 2)
+            anchor = i + ((self._x(i + 1) - q) < (q - self._x(i)))
+            shift = (size - 1) // 2
+        elif self.method == "bessel":
+            anchor, shift = left, size // 2 - 1
+        else:
+            anchor, shift = left, (size - 2) // 2
+        return np.clip(anchor - shift, 0, self.n - size)
+
+    def _x(self, idx):
+        if isinstance(self.xs, UniformGrid):
+            return self.xs.x0 + idx * self.xs.h
+        return self.xs[idx]
+
+    def _nodes(self, starts):
+        idx = starts[:, None] + np.arange(self.size)
+        return self._x(idx), idx
+
+    # ---- Лагранж и Ньютон (разделённые) -----------------------------------
+    @timed("local.fit")
+    def _fit(self, starts):
+        if self._coef is None:
+            self._coef = np.empty((self.n - self.size + 1, self.size))
+            self._fitted = np.zeros(self.n - self.size + 1, dtype=bool)
+        need = np.unique(starts)
+        need = need[~self._fitted[need]]
+        block = max(1, self._BLOCK // (self.size * self.size))
+        for lo in range(0, need.size, block):
+            part = need[lo:lo + block]
+            x, idx = self._nodes(part)
+            if self.method == "lagrange":
+                self._coef[part] = _window_weights(x)
+            else:
+                self._coef[part] = _window_newton(x, self.ys[idx])
+            self._fitted[part] = True
+
+    def _eval_poly(self, q, starts):
+        self._fit(starts)
+        res = np.empty_like(q)
+        block = max(1, self._BLOCK // self.size)
+        for lo in range(0, q.size, block):
+            sl = slice(lo, lo + block)
+            x, idx = self._nodes(starts[sl])
+            coef = self._coef[starts[sl]]
+            qq = q[sl]
+            if self.method == "lagrange":
+                y = self.ys[idx]
+                d = qq[:, None] - x
+                exact = d == 0
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    c = coef / d
+                    out = (c * y).sum(axis=1) / c.sum(axis=1)
+                hit = exact.any(axis=1)
+                out[hit] = y[hit][exact[hit]]
+            else:
+                out = coef[:, -1].copy()
+                for k in range(self.size - 2, -1, -1):
+                    out = out * (qq - x[:, k]) + coef[:, k]
+            res[sl] = out
+        return res
+
+    # ---- конечные разности --------------------------------------------------
+    def _eval_finite(self, q, starts):
+        if self._table is None:
+            self._table = finite_cache.get(self.xs, self.ys, depth=self.size).table
+        if isinstance(self.xs, UniformGrid):
+            h = self.xs.h
+        else:
+            if self._uniform is None:
+                d = np.diff(self.xs)
+                win = np.lib.stride_tricks.sliding_window_view(d, self.size - 1)
+                self._uniform = np.all(np.abs(win - win[:, :1]) <= self.tol, axis=1)
+            if not self._uniform[starts].all():
+                raise ValueError(_FINITE_ERRORS[self.method])
+            h = self.xs[starts + 1] - self.xs[starts]
+        table, size = self._table, self.size
+        if self.method == "stirling":
+            return _stirling_core(q, self.xs, h, table, starts, size)
+        if self.method == "bessel":
+            return _bessel_core(q, self.xs, h, table, starts, size)
+        forward = np.abs(q - self.xs[0]) <= np.abs(q - self.xs[-1])
+        return np.where(forward,
+                        _forward_core(q, self.xs, h, table, starts, size),
+                        _backward_core(q, self.xs, h, table, starts, size))
+
+
+def _window_weights(x):
+    # барицентрические веса для каждой строки x (окна узлов)
+    k = x.shape[1]
+    scale = 4.0 / (x[:, -1] - x[:, 0])
+    d = (x[:, :, None] - x[:, None, :]) * scale[:, None, None]
+    d[:, np.arange(k), np.arange(k)] = 1.0
+    return 1.0 / d.prod(axis=2)
+
+
+def _window_newton(x, y):
+    # коэффициенты Ньютона f[x0], f[x0,x1], … для каждой строки
+    c = y.astype(float, copy=True)
+    for k in range(1, x.shape[1]):
+        c[:, k:] = (c[:, k:] - c[:, k - 1:-1]) / (x[:, k:] - x[:, :-k])
+    return c
@@ -0,0 +1,41 @@
+import numpy as np
+
+
+def adaptive_sample(fn, a, b, width_px=400, height_px=300, tol_px=0.5, initial=17):
+    # fn вычисляет массив значений сразу. Отрезок дробится только там, где
+    # кривая отклоняется от хорды больше чем на tol_px пикселей; всего точек
+    # не больше ширины области графика, интервалы уже пикселя не делятся.
+    max_points = max(2, int(width_px))
+    xs = np.linspace(a, b, min(initial, max_points))
+    ys = np.asarray(fn(xs), dtype=float)
+    finite = ys[np.isfinite(ys)]
+    span = finite.max() - finite.min() if finite.size else 0.0
+    # пикселей на единицу y: по разбросу начальной выборки
+    y_px = height_px / span if span > 0 else height_px
+    min_dx = (b - a) / max_points
+
+    todo = np.arange(len(xs) - 1)  # интервалы, которые ещё могут дробиться
+    while todo.size and len(xs) < max_points:
+        left, right = xs[todo], xs[todo + 1]
+        wide = (right - left) > min_dx
+        todo, left, right = todo[wide], left[wide], right[wide]
+        if not todo.size:
+            break
+        mid = (left + right) / 2
+        ym = np.asarray(fn(mid), dtype=float)
+        dev = np.abs(ym - (ys[todo] + ys[todo + 1]) / 2) * y_px
+        refine = ~(dev <= tol_px)  # NaN тоже дробим: там кривая рвётся
+        budget = max_points - len(xs)
+        if refine.sum() > budget:
+            keep = np.argpartition(np.where(refine, -np.nan_to_num(dev, nan=np.inf), 0), budget)[:budget]
+            refine = np.zeros_like(refine)
+            refine[keep] = True
+        if not refine.any():
+            break
+        pos = todo[refine] + 1
+        xs = np.insert(xs, pos, mid[refine])
+        ys = np.insert(ys, pos, ym[refine])
+        # новые интервалы: у каждого раздробленного — левая и правая половины
+        new_left = pos + np.arange(pos.size) - 1
+        todo = np.sort(np.concatenate([new_left, new_left + 1]))
+    return xs, ys
@@ -0,0 +1,292 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import tempfile
+import time
+from collections import OrderedDict, deque
+from threading import Lock
+
+import numpy as np
+
+from batch import make_evaluator
+from methods import FINITE_METHODS, METHODS, _FINITE_ERRORS, _stencil, fingerprint, is_equally_spaced
+from util import sort_together
+
+# Долгоживущий локальный сервис: JSON-строки через Unix-сокет (или TCP на
+# localhost). Построенные интерполянты хранятся в LRU-кэше по хэшу содержимого,
+# поэтому повторные задания с теми же узлами не перечитывают и не перестраивают
+# ничего. Запросы:
+#   {"op": "fit", "method": "lagrange", "xs": [...], "ys": [...], "width": null}
+#   {"op": "eval", "key": "...", "x": [...]}   (или сразу method/xs/ys вместо key)
+#   {"op": "stats"}, {"op": "ping"}
+# В каждом ответе есть "ok" и "ms" — время обработки запроса.
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), f"interp-{os.getuid() if hasattr(os, 'getuid') else 0}.sock")
+LINE_LIMIT = 1 << 28  # длинные массивы приходят одной строкой
+OPS = ("fit", "eval", "stats", "ping")
+
+
+class ModelCache:
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits,
+                    "misses": self.misses, "evictions": self.evictions}
+
+
+def model_key(method, xs, ys, width=None):
+    return f"{method}:{width or 0}:{fingerprint(xs, ys).hex()}"
+
+
+class InterpolationService:
+    def __init__(self, maxsize=64, history=1000):
+        self.cache = ModelCache(maxsize)
+        self.latency = {}  # op -> последние времена обработки, мс
+        self.requests = {}
+        self._history = history
+
+    def _fit(self, method, xs, ys, width=None):
+        if method not in METHODS:
+            raise ValueError(f"Неизвестный метод: {method}")
+        xs, ys = sort_together(np.asarray(xs, dtype=float), np.asarray(ys, dtype=float))
+        if len(xs) < 2:
+            raise ValueError("Нужно минимум 2 узла")
+        if np.any(np.diff(xs) == 0):
+            raise ValueError("Узлы x не должны повторяться")
+        if method in FINITE_METHODS and _stencil(len(xs), width) >= len(xs) and not is_equally_spaced(xs)[0]:
+            # иначе ключ попал бы в кэш, а каждый eval по нему падал
+            raise ValueError(_FINITE_ERRORS[method])
+        key = model_key(method, xs, ys, width)
+        evaluate = self.cache.get(key)
+        if evaluate is not None:
+            return key, evaluate, True
+        evaluate = make_evaluator(method, xs, ys, width)
+        self.cache.put(key, evaluate)
+        return key, evaluate, False
+
+    def _eval(self, request):
+        key = request.get("key")
+        if key is None:
+            key, evaluate, cached = self._fit(request["method"], request["xs"], request["ys"], request.get("width"))
+        else:
+            evaluate, cached = self.cache.get(key), True
+            if evaluate is None:
+                raise KeyError(f"Модель {key} не найдена (вытеснена из кэша?)")
+        values = evaluate(np.asarray(request["x"], dtype=float))
+        return {"key": key, "cached": cached, "y": np.asarray(values, dtype=float).tolist()}
+
+    def handle(self, request):
+        # синхронная обработка одного запроса; fit/eval — из пула потоков,
+        # stats/ping — в потоке цикла событий (см. serve_client)
+        op = request.get("op")
+        if op == "fit":
+            key, _, cached = self._fit(request["method"], request["xs"], request["ys"], request.get("width"))
+            return {"key": key, "cached": cached}
+        if op == "eval":
+            return self._eval(request)
+        if op == "stats":
+            return self.stats()
+        if op == "ping":
+            return {}
+        raise ValueError(f"Неизвестная операция: {op}")
+
+    def _record(self, op, ms):
+        self.requests[op] = self.requests.get(op, 0) + 1
+        self.latency.setdefault(op, deque(maxlen=self._history)).append(ms)
+
+    def stats(self):
+        latency = {}
+        for op, values in self.latency.items():
+            arr = np.fromiter(values, dtype=float)
+            latency[op] = {"count": self.requests[op], "mean_ms": float(arr.mean()),
+                           "p50_ms": float(np.percentile(arr, 50)), "p95_ms": float(np.percentile(arr, 95)),
+                           "max_ms": float(arr.max())}
+        return {"cache": self.cache.stats(), "latency": latency}
+
+    async def serve_client(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                start = time.perf_counter()
+                op = None
+                try:
+                    request = json.loads(line)
+                    op = request.get("op")
+                    if op in ("stats", "ping"):
+                        # latency и requests меняет только _record в этом же потоке:
+                        # stats обходит их здесь, без гонки с другими клиентами
+                        response = self.handle(request)
+                    else:
+                        # numpy отпускает GIL: вычисления идут в потоках, цикл событий свободен
+                        response = await loop.run_in_executor(None, self.handle, request)
+                    response["ok"] = True
+                except Exception as exc:
+                    # любая ошибка запроса (в том числе Overflow/ZeroDivision/MemoryError) —
+                    # ответ с ok: false, соединение остаётся открытым
+                    response = {"ok": False, "error": str(exc) or type(exc).__name__}
+                ms = (time.perf_counter() - start) * 1e3
+                response["ms"] = ms
+                if isinstance(op, str) and op in OPS:  # произвольные op не плодят ключи статистики
+                    self._record(op, ms)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def _serve(service, path=None, host=None, port=None):
+    if port is not None:
+        server = await asyncio.start_server(service.serve_client, host or "127.0.0.1", port, limit=LINE_LIMIT)
+    else:
+        server = await asyncio.start_unix_server(service.serve_client, path, limit=LINE_LIMIT)
+    async with server:
+        await server.serve_forever()
+
+
+def _claim_socket(path):
+    # оставшийся от упавшего сервиса файл удаляется, живой сервис — нет
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.unlink(path)
+    else:
+        raise OSError(f"Сервис уже запущен: {path}")
+    finally:
+        probe.close()
+
+
+def serve(path=DEFAULT_SOCKET, host=None, port=None, maxsize=64):
+    service = InterpolationService(maxsize)
+    if port is None:
+        _claim_socket(path)
+    try:
+        asyncio.run(_serve(service, path, host, port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if port is None and path and os.path.exists(path):
+            os.unlink(path)
+
+
+class Client:
+    # простой синхронный клиент: один запрос — одна строка туда и обратно
+    def __init__(self, path=DEFAULT_SOCKET, host=None, port=None, timeout=None):
+        if port is not None:
+            self._sock = socket.create_connection((host or "127.0.0.1", port), timeout)
+        else:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.settimeout(timeout)
+            self._sock.connect(path)
+        self._file = self._sock.makefile("rb")
+
+    def request(self, op, **fields):
+        self._sock.sendall(json.dumps(dict(fields, op=op)).encode() + b"\n")
+        response = json.loads(self._file.readline())
+        if not response.get("ok"):
+            raise RuntimeError(response.get("error", "ошибка сервиса"))
+        return response
+
+    def fit(self, method, xs, ys, width=None):
+        return self.request("fit", method=method, xs=np.asarray(xs, dtype=float).tolist(),
+                            ys=np.asarray(ys, dtype=float).tolist(), width=width)["key"]
+
+    def evaluate(self, key, x):
+        return np.array(self.request("eval", key=key, x=np.asarray(x, dtype=float).tolist())["y"])
+
+    def stats(self):
+        return self.request("stats")
+
+    def close(self):
+        self._file.close()
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _add_address(parser):
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="путь к Unix-сокету")
+    parser.add_argument("--port", type=int, default=None, help="TCP-порт на localhost вместо Unix-сокета")
+
+
+def run_serve(argv):
+    parser = argparse.ArgumentParser(prog="main.py serve", description="Локальный сервис интерполяции")
+    _add_address(parser)
+    parser.add_argument("--cache", type=int, default=64, help="сколько моделей держать в кэше")
+    args = parser.parse_args(argv)
+    where = f"127.0.0.1:{args.port}" if args.port is not None else args.socket
+    try:
+        if args.port is None:
+            _claim_socket(args.socket)
+        print(f"Сервис слушает {where}", file=sys.stderr)
+        serve(args.socket, port=args.port, maxsize=max(1, args.cache))
+    except OSError as exc:
+        print(f"Ошибка: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def run_client(argv):
+    from util import stream_csv, stream_column
+
+    parser = argparse.ArgumentParser(prog="main.py client", description="Проверочный клиент сервиса")
+    _add_address(parser)
+    parser.add_argument("--nodes", required=True, help="CSV с узлами x,y")
+    parser.add_argument("--queries", required=True, help="CSV с точками x (первый столбец)")
+    parser.add_argument("--method", choices=METHODS, default="lagrange")
+    parser.add_argument("--width", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=1, help="повторить задание (проверка кэша)")
+    args = parser.parse_args(argv)
+    try:
+        data = stream_csv(args.nodes)
+        queries = np.concatenate([values for values, _ in stream_column(args.queries)] or [np.empty(0)])
+        with Client(args.socket, port=args.port) as client:
+            for _ in range(max(1, args.repeat)):
+                key = client.fit(args.method, data.xs, data.ys, args.width or None)
+                values = client.evaluate(key, queries)
+            for x, y in zip(queries[:10], values[:10]):
+                print(f"{x:.10g},{y:.10g}")
+            if len(queries) > 10:
+                print(f"… всего {len(queries)} точек")
+            print(json.dumps(client.stats(), ensure_ascii=False, indent=2))
+    except (OSError, ValueError, RuntimeError) as exc:
+        print(f"Ошибка: {exc}", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,49 @@
+import time
+from functools import wraps
+from threading import Lock
+
+# Необязательные счётчики горячих путей: число вызовов и суммарное (включая
+# вложенные вызовы) время. По умолчанию выключены, и обёртка стоит одну
+# проверку флага; включаются из интерфейса или бенчмарка.
+
+
+class Counters:
+    def __init__(self):
+        self.enabled = False
+        self._data = {}
+        self._lock = Lock()
+
+    def enable(self, flag=True):
+        self.enabled = flag
+
+    def reset(self):
+        with self._lock:
+            self._data.clear()
+
+    def add(self, name, seconds):
+        with self._lock:
+            entry = self._data.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def snapshot(self):
+        with self._lock:
+            return {name: {"calls": calls, "seconds": seconds} for name, (calls, seconds) in self._data.items()}
+
+
+counters = Counters()
+
+
+def timed(name):
+    def wrap(fn):
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            if not counters.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                counters.add(name, time.perf_counter() - start)
+        return inner
+    return wrap
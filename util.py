@@ -1,24 +1,184 @@
 import csv
+import json
+import os
+from collections import namedtuple
+from itertools import islice
 
+import numpy as np
 
-def load_csv(path: str):
-    xs, ys = [], []
+from timing import timed
+
+CsvData = namedtuple("CsvData", "xs ys skipped")
+
+CHUNK_ROWS = 1 << 16
+_CACHE_VERSION = 1
+
+
+def _sidecar(path: str, series: bool = False):
+    base = path + ".all" if series else path
+    return base + ".xs.npy", base + ".ys.npy", base + ".meta.json"
+
+
+def _source_stamp(path: str):
+    st = os.stat(path)
+    return {"version": _CACHE_VERSION, "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+
+def _read_cache(path: str, series: bool = False):
+    xs_path, ys_path, meta_path = _sidecar(path, series)
+    try:
+        with open(meta_path, encoding="utf-8") as fp:
+            meta = json.load(fp)
+        stamp = _source_stamp(path)
+        if any(meta.get(k) != v for k, v in stamp.items()):
+            return None
+        # "c" — копирование при записи: массивы можно править, файл не меняется
+        xs = np.load(xs_path, mmap_mode="c")
+        ys = np.load(ys_path, mmap_mode="c")
+    except (OSError, ValueError):
+        return None
+    if xs.ndim != 1 or len(xs) != len(ys) or ys.ndim != (2 if series else 1):
+        return None
+    return CsvData(xs, ys, meta.get("skipped", 0))
+
+
+def _write_cache(path: str, data: CsvData, stamp, series: bool = False):
+    xs_path, ys_path, meta_path = _sidecar(path, series)
+    try:
+        for target, arr in ((xs_path, data.xs), (ys_path, data.ys)):
+            tmp = target + ".tmp"
+            with open(tmp, "wb") as fp:
+                np.save(fp, arr)
+            os.replace(tmp, target)
+        # метаданные пишутся последними: без них кэш считается недействительным
+        tmp = meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fp:
+            json.dump(dict(stamp, skipped=data.skipped), fp)
+        os.replace(tmp, meta_path)
+    except OSError:
+        pass
+
+
+def _parse_column(cells):
+    try:
+        return np.array(cells, dtype=float), np.zeros(len(cells), dtype=bool)
+    except ValueError:
+        pass
+    # в пачке есть десятичные запятые или мусор — разбираем поштучно
+    out = np.empty(len(cells))
+    bad = np.zeros(len(cells), dtype=bool)
+    for i, cell in enumerate(cells):
+        try:
+            out[i] = float(cell.replace(",", "."))
+        except ValueError:
+            bad[i] = True
+    return out, bad
+
+
+@timed("csv.load")
+def stream_csv(path: str, chunk_rows: int = CHUNK_ROWS, use_cache: bool = True, series: bool = False) -> CsvData:
+    # series=True: все столбцы после первого — ряды y на общих x, ys — матрица
+    # (n, k); k берётся по первой строке, строки с меньшим числом столбцов пропускаются
+    if use_cache:
+        cached = _read_cache(path, series)
+        if cached is not None:
+            return cached
+    stamp = _source_stamp(path)
+
+    capacity = chunk_rows
+    k = None if series else 1
+    xs = np.empty(capacity)
+    ys = None
+    count = skipped = 0
     with open(path, newline="", encoding="utf-8-sig") as fp:
         reader = csv.reader(fp, delimiter=",", skipinitialspace=True)
-        for row in reader:
-            if len(row) < 2:
+        for chunk in iter(lambda: list(islice(reader, chunk_rows)), []):
+            if k is None:
+                k = next((len(row) - 1 for row in chunk if len(row) >= 2), None)
+                if k is None:
+                    skipped += len(chunk)
+                    continue
+            if ys is None:
+                ys = np.empty((capacity, k))
+            rows = [row for row in chunk if len(row) >= k + 1]
+            skipped += len(chunk) - len(rows)
+            if not rows:
                 continue
-            try:
-                xs.append(float(row[0].replace(",", ".")))
-                ys.append(float(row[1].replace(",", ".")))
-            except ValueError:
-                continue
-    return xs, ys
+            cx, bad = _parse_column([row[0] for row in rows])
+            cy = np.empty((len(rows), k))
+            for j in range(k):
+                cy[:, j], bad_y = _parse_column([row[j + 1] for row in rows])
+                bad |= bad_y
+            if bad.any():
+                skipped += int(bad.sum())
+                cx, cy = cx[~bad], cy[~bad]
+            if count + len(cx) > capacity:
+                capacity = max(2 * capacity, count + len(cx))
+                xs = np.resize(xs, capacity)
+                ys = np.resize(ys, (capacity, k))
+            xs[count:count + len(cx)] = cx
+            ys[count:count + len(cy)] = cy
+            count += len(cx)
+
+    if ys is None:
+        ys = np.empty((0, k or 1))
+    data = CsvData(xs[:count].copy(), ys[:count].copy() if series else ys[:count, 0].copy(), skipped)
+    if use_cache:
+        _write_cache(path, data, stamp, series)
+    return data
+
+
+def stream_column(path: str, chunk_rows: int = CHUNK_ROWS, column: int = 0):
+    # генератор пачек (значения, пропущено) из одного столбца: файл целиком
+    # в память не читается
+    with open(path, newline="", encoding="utf-8-sig") as fp:
+        reader = csv.reader(fp, delimiter=",", skipinitialspace=True)
+        for chunk in iter(lambda: list(islice(reader, chunk_rows)), []):
+            cells = [row[column] for row in chunk if len(row) > column]
+            values, bad = _parse_column(cells)
+            yield values[~bad], len(chunk) - len(cells) + int(bad.sum())
+
+
+def load_csv(path: str, series: bool = False):
+    data = stream_csv(path, series=series)
+    return data.xs, data.ys
+
+
+def parse_pairs(text: str):
+    # пары x, y из вставленного текста: столбцы через табуляцию, «;» или «,»
+    xs, ys = [], []
+    skipped = 0
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        sep = next((s for s in ("\t", ";") if s in line), None)
+        if sep is not None:
+            cells = [c.strip() for c in line.split(sep)]
+        elif "," in line:
+            # запятая — разделитель столбцов, десятичные запятые только в кавычках
+            cells = next(csv.reader([line], skipinitialspace=True))
+        else:
+            cells = line.split()
+        try:
+            x, y = float(cells[0].replace(",", ".")), float(cells[1].replace(",", "."))
+        except (IndexError, ValueError):
+            skipped += 1
+            continue
+        xs.append(x)
+        ys.append(y)
+    return np.array(xs), np.array(ys), skipped
 
 
 def sort_together(xs, ys):
     if len(xs) != len(ys):
         raise ValueError("Массивы должны быть одной длины")
+    if isinstance(xs, np.ndarray) or isinstance(ys, np.ndarray):
+        xs, ys = np.asarray(xs, dtype=float), np.asarray(ys, dtype=float)
+        if xs.size < 2 or np.all(xs[1:] >= xs[:-1]):
+            return xs, ys
+        order = np.argsort(xs, kind="stable")
+        return xs[order], ys[order]
     paired = list(zip(xs, ys))
     paired.sort(key=lambda p: p[0])
     xs_sorted, ys_sorted = zip(*paired) if paired else ([], [])
@@ -0,0 +1,97 @@
+from collections import namedtuple
+from math import comb
+
+import numpy as np
+
+from methods import (FINITE_METHODS, METHODS, LocalInterpolant, _FINITE_ERRORS, _finite_data, _stencil,
+                     _window_weights, divided_differences, evaluate_many)
+from timing import timed
+
+# Перекрёстная проверка «без одного узла» (leave-one-out): для каждого узла i
+# остаток y_i − p₋ᵢ(x_i), где p₋ᵢ построен по остальным узлам. Полином не
+# строится n раз заново: барицентрические веса после вычёркивания узла
+# получаются из общих (w_j → w_j·(x_j − x_i)), а для разностных схем остаток
+# берётся из старшей разности уже построенной таблицы. Все n проверок — O(n²).
+
+Validation = namedtuple("Validation", "residuals errors grid spread")
+
+
+def _downdate(w, y, wi, yi):
+    # p₋ᵢ(x_i) = Σ_{j≠i} w_j y_j / Σ_{j≠i} w_j — барицентрическая форма
+    # с пониженными весами w_j·(x_j − x_i), вычисленная в самой точке x_i
+    sw = w.sum(axis=-1)
+    swy = (w * y).sum(axis=-1)
+    return yi - (swy - wi * yi) / (sw - wi)
+
+
+def loo_residuals(method, xs, ys, width=None):
+    if method not in METHODS:
+        raise ValueError(f"Неизвестный метод: {method}")
+    n = len(xs)
+    if n != len(ys):
+        raise ValueError("Массивы должны быть одной длины")
+    if n < 3:
+        raise ValueError("Для перекрёстной проверки нужно минимум 3 узла")
+    ys = np.asarray(ys, dtype=float)
+    if method in FINITE_METHODS:
+        # формулы ниже верны для интерполяционного полинома; Стирлинг при чётном
+        # и Бессель при нечётном числе узлов (шаблона) через узлы не проходят
+        gap = np.abs(evaluate_many(method, xs, ys, np.asarray(xs, dtype=float), width) - ys).max()
+        if not gap <= 1e-8 * max(1.0, np.abs(ys).max()):
+            raise ValueError(f"схема не проходит через узлы (отклонение до {gap:.3g}), проверка неприменима")
+    if _stencil(n, width) < n:
+        return _local_residuals(method, xs, ys, width)
+    i = np.arange(n)
+    if method in FINITE_METHODS:
+        # равный шаг: e_i = (−1)^{n−1−i} Δ^{n−1}y₀ / C(n−1, i)
+        top = _finite_data(xs, ys, _FINITE_ERRORS[method]).table[n - 1][0]
+        sign = np.where((n - 1 - i) % 2, -1.0, 1.0)
+        return sign * top / np.array([float(comb(n - 1, k)) for k in i])
+    x = np.asarray(xs, dtype=float)
+    if method == "divided":
+        # e_i = f[x₀…x_{n−1}] · Π_{j≠i} (x_i − x_j)
+        top = divided_differences(x, ys)[n - 1][0]
+        d = x[:, None] - x[None, :]
+        d[i, i] = 1.0
+        return top * d.prod(axis=1)
+    w = _window_weights(x[None, :])[0]
+    return _downdate(w, ys, w, ys)
+
+
+def _local_residuals(method, xs, ys, width):
+    # узел вычёркивается из того шаблона, которым схема считала бы значение в x_i
+    local = LocalInterpolant(xs, ys, method, width)
+    n = local.n
+    x_all = np.asarray(xs, dtype=float)
+    rows = np.arange(n)
+    starts = local._starts(x_all, rows)
+    idx = starts[:, None] + np.arange(local.size)
+    x = x_all[idx]
+    if method in FINITE_METHODS:
+        d = np.diff(x, axis=1)
+        if not np.all(np.abs(d - d[:, :1]) <= local.tol):
+            raise ValueError(_FINITE_ERRORS[method])
+    w = _window_weights(x)
+    pos = rows - starts
+    return _downdate(w, ys[idx], w[rows, pos], ys)
+
+
+@timed("validate")
+def cross_validate(xs, ys, methods=METHODS, width=None, points=201):
+    # остатки по каждому методу и разброс между методами на сетке из points точек
+    residuals, errors, curves = {}, {}, []
+    x = np.asarray(xs, dtype=float)
+    grid = np.linspace(x.min(), x.max(), points)
+    for method in methods:
+        try:
+            curve = evaluate_many(method, xs, ys, grid, width)
+        except (ValueError, ZeroDivisionError) as exc:
+            errors[method] = str(exc)
+            continue
+        curves.append(curve)  # схема без проверки (не проходит через узлы) в разбросе остаётся
+        try:
+            residuals[method] = loo_residuals(method, xs, ys, width)
+        except (ValueError, ZeroDivisionError) as exc:
+            errors[method] = str(exc)
+    spread = np.ptp(np.vstack(curves), axis=0) if len(curves) > 1 else np.zeros_like(grid)
+    return Validation(residuals, errors, grid, spread)
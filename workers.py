@@ -0,0 +1,166 @@
+import threading
+from collections import namedtuple
+
+import numpy as np
+from PyQt5 import QtCore
+
+from methods import (FINITE_METHODS, LagrangeInterpolant, LocalInterpolant, NewtonInterpolant, evaluate_many,
+                     evaluate_series, finite_cache, newton_finite, stirling_interpolate, bessel_interpolate)
+from validation import cross_validate
+
+MethodResult = namedtuple("MethodResult", "method text label value xx yy fitted")
+
+METHOD_TITLES = {
+    "lagrange": "Лагранж",
+    "divided": "Ньютон (разделённые)",
+    "finite": "Ньютон (конечные)",
+    "stirling": "Стирлинг",
+    "bessel": "Бессель",
+    "chebyshev": "Чебышёв (ДКП)",
+}
+
+
+class Cancelled(Exception):
+    pass
+
+
+class Job:
+    # одно нажатие «Вычислить»: номер, флаг отмены и число незавершённых задач
+    def __init__(self, job_id, tasks):
+        self.id = job_id
+        self.pending = tasks
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def check(self):
+        if self._cancel.is_set():
+            raise Cancelled
+
+
+def compute_method(method, xs, ys, x0, sample, width=None, job=None, fitted=None):
+    # вычисление одной схемы без обращений к Qt: значение в x₀ и, если задан
+    # sample(curve) -> (xx, yy), кривая; fitted — уже построенный интерполянт
+    check = job.check if job is not None else (lambda: None)
+    local = width is not None and width < len(xs)
+    title = METHOD_TITLES[method]
+    check()
+    if method == "lagrange":
+        if fitted is None:
+            fitted = LocalInterpolant(xs, ys, "lagrange", width) if local else LagrangeInterpolant(xs, ys)
+        label = title
+    elif method == "divided":
+        if fitted is None:
+            fitted = LocalInterpolant(xs, ys, "divided", width) if local else NewtonInterpolant(xs, ys)
+        label = title
+    elif method == "chebyshev":
+        # интерполянт строится вместе с узлами (см. ChebyshevInterpolant.from_function)
+        if fitted is None:
+            raise ValueError("нет интерполянта по узлам Чебышёва")
+        title = f"{title}, n = {len(fitted.xs)}, степень {len(fitted.coeffs) - 1}"
+        if fitted.converged is False:
+            error = "" if fitted.error is None else f", ошибка ≈ {fitted.error:.1e}"
+            title = f"⚠ {title}, точность не достигнута{error}"
+        label = METHOD_TITLES[method]
+    else:
+        try:
+            if method == "finite":
+                value, _, form = newton_finite(x0, xs, ys, width)
+                title, label = f"Ньютон (конечные, {form})", f"Ньютон конечные ({form})"
+            elif method == "stirling":
+                value, _ = stirling_interpolate(x0, xs, ys, width)
+                label = title
+            else:
+                value, _ = bessel_interpolate(x0, xs, ys, width)
+                label = title
+        except ValueError as exc:
+            return MethodResult(method, f"⚠ {title}: {exc}", None, None, None, None, None)
+        check()
+        xx, yy = sample(lambda t: evaluate_many(method, xs, ys, t, width)) if sample else (None, None)
+        return MethodResult(method, f"{title}: y({x0}) ≈ {value:.10g}", label, value, xx, yy, None)
+    value = fitted(x0)
+    check()
+    xx, yy = sample(fitted.many) if sample else (None, None)
+    return MethodResult(method, f"{title}: y({x0}) ≈ {value:.10g}", label, value, xx, yy, fitted)
+
+
+def compute_series(method, xs, ys, x0, xx, width=None, job=None):
+    # несколько рядов (столбцы ys) одной схемой: веса узлов общие, значения в x₀
+    # и кривые на сетке xx — матрицы (·, k)
+    check = job.check if job is not None else (lambda: None)
+    title = METHOD_TITLES[method]
+    check()
+    try:
+        value = evaluate_series(method, xs, ys, [x0], width)[0]
+        check()
+        yy = evaluate_series(method, xs, ys, xx, width) if xx is not None else None
+    except ValueError as exc:
+        return MethodResult(method, f"⚠ {title}: {exc}", None, None, None, None, None)
+    text = f"{title}: y({x0}) ≈ " + ", ".join(f"{v:.10g}" for v in value)
+    return MethodResult(method, text, title, value, xx, yy, None)
+
+
+def compute_validation(xs, ys, methods, width=None, job=None):
+    # перекрёстная проверка для панели результатов: текст в поле text
+    if job is not None:
+        job.check()
+    v = cross_validate(xs, ys, methods, width)
+    lines = [f"Проверка без одного узла (n = {len(xs)}):"]
+    for method in methods:
+        title = METHOD_TITLES[method]
+        if method in v.errors:
+            lines.append(f"  ⚠ {title}: {v.errors[method]}")
+            continue
+        r = np.abs(v.residuals[method])
+        worst = int(np.argmax(r))
+        lines.append(f"  {title}: RMS {np.sqrt(np.mean(r ** 2)):.3g}, макс. {r[worst]:.3g} "
+                     f"(узел {worst + 1}, x = {float(xs[worst]):.6g})")
+    same = [METHOD_TITLES[m] for m in FINITE_METHODS if m in v.residuals]
+    if same and (width is None or width >= len(xs)):
+        lines.append(f"  ({', '.join(same)}: тот же интерполяционный полином, остатки совпадают с Лагранжем)")
+    if len(v.residuals) > 1:
+        worst = int(np.argmax(v.spread))
+        lines.append(f"Разброс между методами: макс. {v.spread[worst]:.3g} при x ≈ {v.grid[worst]:.6g}, "
+                     f"средний {v.spread.mean():.3g}")
+    return MethodResult("validate", "\n".join(lines), None, None, None, None, None)
+
+
+class TaskSignals(QtCore.QObject):
+    finished = QtCore.pyqtSignal(object, str, object)  # job, задача, результат
+    failed = QtCore.pyqtSignal(object, str, str)  # job, задача, сообщение
+
+
+class Task(QtCore.QRunnable):
+    def __init__(self, job, method, fn, *args, **kwargs):
+        super().__init__()
+        self.job = job
+        self.method = method
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = TaskSignals()
+
+    def run(self):
+        if self.job.cancelled:
+            return
+        try:
+            result = self.fn(*self.args, job=self.job, **self.kwargs)
+        except Cancelled:
+            return
+        except Exception as exc:
+            self.signals.failed.emit(self.job, self.method, str(exc) or type(exc).__name__)
+            return
+        self.signals.finished.emit(self.job, self.method, result)
+
+
+def compute_table(xs, ys, depth=None, job=None):
+    # таблица для показа: полная или, при локальном шаблоне, depth уровней
+    if job is not None:
+        job.check()
+    data = finite_cache.get(xs, ys, full=depth is None, depth=depth)
+    return data.table if data.equal else None